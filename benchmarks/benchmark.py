@@ -0,0 +1,578 @@
+"""Benchmarks for BinaryReader.\n
+Runs every benchmark at each of the given buffer sizes and reports operations and bytes per second.
+Results can be saved as a baseline, and later runs can be compared against it to find regressions.\n
+Usage: python benchmarks/benchmark.py [--sizes 4K,1M,16M] [--filter read_] [--save FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from binary_reader import BinaryReader, BrStruct, Endian, Whence  # noqa: E402
+from binary_reader.binary_reader import FMT, TYPES  # noqa: E402
+
+# Name of each read_/write_ type, excluding bytes, which is benchmarked separately
+NUMERIC_TYPES = [name for name, format in TYPES.items() if format != "s"]
+
+# Number of values in each counted read/write
+COUNT = 64
+
+BENCHMARKS = []
+
+
+def benchmark(name: str):
+    """Registers a benchmark function.\n
+    The function receives the buffer size and the maximum number of operations,
+    and returns a tuple of (function that runs the operations once, number of operations, number of bytes processed).
+    """
+    def decorator(func):
+        BENCHMARKS.append((name, func))
+        return func
+
+    return decorator
+
+
+def parse_size(text: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper().rstrip("B")
+
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit, value in (("G", 1 << 30), ("M", 1 << 20), ("K", 1 << 10)):
+        if size >= value and size % value == 0:
+            return f"{size // value}{unit}"
+    return str(size)
+
+
+def make_buffer(size: int) -> bytes:
+    return random.Random(size).randbytes(size) if hasattr(random.Random, "randbytes") else bytes(size)
+
+
+class ManualVector(BrStruct):
+    def __br_read__(self, br: BinaryReader) -> None:
+        self.x, self.y, self.z = br.read_float(3)
+        self.flags = br.read_uint32()
+
+    def __br_write__(self, br: BinaryReader) -> None:
+        br.write_float((self.x, self.y, self.z))
+        br.write_uint32(self.flags)
+
+
+class DeclaredVector(BrStruct):
+    __br_fields__ = (("x", "float"), ("y", "float"), ("z", "float"), ("flags", "uint32"))
+
+
+def make_vectors(cls: type, count: int) -> list:
+    vectors = []
+
+    for i in range(count):
+        v = cls()
+        v.x, v.y, v.z, v.flags = 1.0, 2.0, float(i), i
+        vectors.append(v)
+
+    return vectors
+
+
+def scalar_read_benchmark(type_name: str):
+    def bench(size, max_ops):
+        item = FMT[TYPES[type_name]]
+        br = BinaryReader.from_buffer(make_buffer(size))
+        ops = min(size // item, max_ops)
+        read = getattr(br, "read_" + type_name)
+
+        def run():
+            br.seek(0)
+            for _ in range(ops):
+                read()
+
+        return run, ops, ops * item
+
+    return bench
+
+
+def counted_read_benchmark(type_name: str):
+    def bench(size, max_ops):
+        item = FMT[TYPES[type_name]] * COUNT
+        br = BinaryReader.from_buffer(make_buffer(size))
+        ops = min(size // item, max_ops)
+        read = getattr(br, "read_" + type_name)
+
+        def run():
+            br.seek(0)
+            for _ in range(ops):
+                read(COUNT)
+
+        return run, ops, ops * item
+
+    return bench
+
+
+def scalar_write_benchmark(type_name: str):
+    def bench(size, max_ops):
+        item = FMT[TYPES[type_name]]
+        ops = min(size // item, max_ops)
+        value = 1.0 if "float" in type_name else 1
+
+        def run():
+            br = BinaryReader()
+            write = getattr(br, "write_" + type_name)
+            for _ in range(ops):
+                write(value)
+
+        return run, ops, ops * item
+
+    return bench
+
+
+def iterable_write_benchmark(type_name: str):
+    def bench(size, max_ops):
+        item = FMT[TYPES[type_name]] * COUNT
+        ops = min(size // item, max_ops)
+        values = [1.0 if "float" in type_name else 1] * COUNT
+
+        def run():
+            br = BinaryReader()
+            write = getattr(br, "write_" + type_name)
+            for _ in range(ops):
+                write(values)
+
+        return run, ops, ops * item
+
+    return bench
+
+
+for type_name in NUMERIC_TYPES:
+    benchmark(f"read_{type_name}")(scalar_read_benchmark(type_name))
+    benchmark(f"read_{type_name}[{COUNT}]")(counted_read_benchmark(type_name))
+    benchmark(f"write_{type_name}")(scalar_write_benchmark(type_name))
+    benchmark(f"write_{type_name}[{COUNT}]")(iterable_write_benchmark(type_name))
+
+
+@benchmark("read_bytes[16]")
+def bench_read_bytes(size, max_ops):
+    br = BinaryReader.from_buffer(make_buffer(size))
+    ops = min(size // 16, max_ops)
+
+    def run():
+        br.seek(0)
+        for _ in range(ops):
+            br.read_bytes(16)
+
+    return run, ops, ops * 16
+
+
+@benchmark("read_format(IIf3h)")
+def bench_read_format(size, max_ops):
+    br = BinaryReader.from_buffer(make_buffer(size))
+    ops = min(size // 18, max_ops)
+
+    def run():
+        br.seek(0)
+        for _ in range(ops):
+            br.read_format("IIf3h")
+
+    return run, ops, ops * 18
+
+
+@benchmark("iter_records(IIf3h)")
+def bench_iter_records(size, max_ops):
+    br = BinaryReader.from_buffer(make_buffer(size))
+    ops = min(size // 18, max_ops)
+
+    def run():
+        br.seek(0)
+        for _ in br.iter_records("IIf3h", ops):
+            pass
+
+    return run, ops, ops * 18
+
+
+@benchmark("write_format(IIf3h)")
+def bench_write_format(size, max_ops):
+    ops = min(size // 18, max_ops)
+
+    def run():
+        br = BinaryReader()
+        for _ in range(ops):
+            br.write_format("IIf3h", 1, 2, 1.0, 3, 4, 5)
+
+    return run, ops, ops * 18
+
+
+@benchmark(f"read_compact(uint16)[{COUNT}]")
+def bench_read_compact(size, max_ops):
+    br = BinaryReader.from_buffer(make_buffer(size), Endian.BIG)
+    ops = min(size // (2 * COUNT), max_ops)
+
+    def run():
+        br.seek(0)
+        for _ in range(ops):
+            br.read_compact("uint16", COUNT)
+
+    return run, ops, ops * 2 * COUNT
+
+
+@benchmark(f"write_uint16(array)[{COUNT}]")
+def bench_write_compact(size, max_ops):
+    ops = min(size // (2 * COUNT), max_ops)
+    values = array("H", [1] * COUNT)
+
+    def run():
+        br = BinaryReader(endianness=Endian.BIG)
+        for _ in range(ops):
+            br.write_uint16(values)
+
+    return run, ops, ops * 2 * COUNT
+
+
+def string_table(size: int) -> bytes:
+    names = bytearray()
+    i = 0
+    while len(names) < size:
+        names += b"name_%d\x00" % i
+        i += 1
+
+    return bytes(names[:size])
+
+
+@benchmark("read_str")
+def bench_read_str(size, max_ops):
+    data = string_table(size)
+    br = BinaryReader.from_buffer(data)
+    ops = min(data.count(b"\x00"), max_ops)
+
+    def run():
+        br.seek(0)
+        for _ in range(ops):
+            br.read_str()
+
+    return run, ops, br.size() * ops // max(data.count(b"\x00"), 1)
+
+
+@benchmark("read_str[16]")
+def bench_read_str_sized(size, max_ops):
+    br = BinaryReader.from_buffer(string_table(size))
+    ops = min(size // 16, max_ops)
+
+    def run():
+        br.seek(0)
+        for _ in range(ops):
+            br.read_str(16)
+
+    return run, ops, ops * 16
+
+
+@benchmark("read_str_to_token")
+def bench_read_str_to_token(size, max_ops):
+    data = string_table(size).replace(b"\x00", b"\r\n")[:size]
+    br = BinaryReader.from_buffer(data)
+    ops = min(data.count(b"\r\n"), max_ops)
+
+    def run():
+        br.seek(0)
+        for _ in range(ops):
+            br.read_str_to_token("\r\n")
+
+    return run, ops, size * ops // max(data.count(b"\r\n"), 1)
+
+
+@benchmark("find_all(DDS )")
+def bench_find_all(size, max_ops):
+    data = bytearray(make_buffer(size))
+    for i in range(0, size - 4, 4096):
+        data[i:i + 4] = b"DDS "
+    br = BinaryReader.from_buffer(bytes(data))
+    ops = len(range(0, size - 4, 4096))
+
+    def run():
+        for _ in br.find_all(b"DDS "):
+            pass
+
+    return run, ops, size
+
+
+@benchmark("read_strs")
+def bench_read_strs(size, max_ops):
+    data = string_table(size)
+    br = BinaryReader.from_buffer(data)
+    ops = min(data.count(b"\x00"), max_ops)
+
+    def run():
+        br.seek(0)
+        br.read_strs(ops)
+
+    return run, ops, size * ops // max(data.count(b"\x00"), 1)
+
+
+def struct_read_benchmark(cls: type):
+    def bench(size, max_ops):
+        br = BinaryReader.from_buffer(make_buffer(size))
+        ops = min(size // 16, max_ops)
+
+        def run():
+            br.seek(0)
+            br.read_struct(cls, ops)
+
+        return run, ops, ops * 16
+
+    return bench
+
+
+def struct_write_benchmark(cls: type):
+    def bench(size, max_ops):
+        ops = min(size // 16, max_ops)
+        vectors = make_vectors(cls, ops)
+
+        def run():
+            BinaryReader().write_struct(vectors)
+
+        return run, ops, ops * 16
+
+    return bench
+
+
+benchmark("read_struct(manual)")(struct_read_benchmark(ManualVector))
+benchmark("read_struct(declared)")(struct_read_benchmark(DeclaredVector))
+benchmark("write_struct(manual)")(struct_write_benchmark(ManualVector))
+benchmark("write_struct(declared)")(struct_write_benchmark(DeclaredVector))
+
+
+@benchmark("write_bytes[16]")
+def bench_write_bytes(size, max_ops):
+    ops = min(size // 16, max_ops)
+    value = bytes(range(16))
+
+    def run():
+        br = BinaryReader()
+        for _ in range(ops):
+            br.write_bytes(value)
+
+    return run, ops, ops * 16
+
+
+@benchmark("write_str")
+def bench_write_str(size, max_ops):
+    ops = min(size // 16, max_ops)
+
+    def run():
+        br = BinaryReader()
+        for _ in range(ops):
+            br.write_str("name_of_a_thing", null=True)
+
+    return run, ops, ops * 16
+
+
+@benchmark("pad[16]")
+def bench_pad(size, max_ops):
+    ops = min(size // 16, max_ops)
+
+    def run():
+        br = BinaryReader()
+        for _ in range(ops):
+            br.pad(16)
+
+    return run, ops, ops * 16
+
+
+@benchmark("align[16]")
+def bench_align(size, max_ops):
+    ops = min(size // 16, max_ops)
+
+    def run():
+        br = BinaryReader()
+        for _ in range(ops):
+            br.write_uint8(1)
+            br.align(16)
+
+    return run, ops, ops * 16
+
+
+@benchmark("extend[16]")
+def bench_extend(size, max_ops):
+    ops = min(size // 16, max_ops)
+    value = bytes(16)
+
+    def run():
+        br = BinaryReader()
+        for _ in range(ops):
+            br.extend(value)
+
+    return run, ops, ops * 16
+
+
+@benchmark("reserve+write_uint32")
+def bench_reserve_write(size, max_ops):
+    ops = min(size // 4, max_ops)
+
+    def run():
+        br = BinaryReader()
+        br.reserve(ops * 4)
+        for _ in range(ops):
+            br.write_uint32(1)
+
+    return run, ops, ops * 4
+
+
+@benchmark("write_from[4K]")
+def bench_write_from(size, max_ops):
+    ops = min(size // 4096, max_ops)
+    data = make_buffer(ops * 4096)
+
+    def run():
+        br = BinaryReader()
+        for i in range(ops):
+            br.write_from(data, i * 4096, 4096)
+
+    return run, ops, ops * 4096
+
+
+@benchmark("trim")
+def bench_trim(size, max_ops):
+    ops = min(size // 16, max_ops)
+    data = make_buffer(size)
+
+    def run():
+        br = BinaryReader(data)
+        for i in range(ops):
+            br.trim(size - i * 16)
+
+    return run, ops, ops * 16
+
+
+@benchmark("seek+read_uint32(random)")
+def bench_random_access(size, max_ops):
+    br = BinaryReader.from_buffer(make_buffer(size))
+    ops = min(size // 4, max_ops)
+    offsets = [random.Random(0).randrange(size - 4) for _ in range(ops)]
+
+    def run():
+        for offset in offsets:
+            br.seek(offset)
+            br.read_uint32()
+
+    return run, ops, ops * 4
+
+
+@benchmark("seek_to+read_uint32(random)")
+def bench_random_seek_to(size, max_ops):
+    br = BinaryReader.from_buffer(make_buffer(size))
+    ops = min(size // 4, max_ops)
+    offsets = [random.Random(1).randrange(size - 4) for _ in range(ops)]
+
+    def run():
+        for offset in offsets:
+            with br.seek_to(offset):
+                br.read_uint32()
+
+    return run, ops, ops * 4
+
+
+@benchmark("seek(CUR)+read_uint32(strided)")
+def bench_strided_access(size, max_ops):
+    br = BinaryReader.from_buffer(make_buffer(size), Endian.BIG)
+    ops = min(size // 64, max_ops)
+
+    def run():
+        br.seek(0)
+        for _ in range(ops):
+            br.read_uint32()
+            br.seek(60, Whence.CUR)
+
+    return run, ops, ops * 4
+
+
+def run_benchmarks(sizes, name_filter: str, repeat: int, max_ops: int) -> dict:
+    results = dict()
+
+    for name, func in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+
+        for size in sizes:
+            run, ops, nbytes = func(size, max_ops)
+            if ops <= 0:
+                continue
+
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - start)
+
+            best = max(best, 1e-9)
+            key = f"{name}@{format_size(size)}"
+            results[key] = {"ops_per_sec": ops / best, "bytes_per_sec": nbytes / best, "ns_per_op": best / ops * 1e9}
+
+            print(f"{key:40s} {ops / best:14,.0f} ops/s {nbytes / best / (1 << 20):10,.1f} MiB/s "
+                  f"{best / ops * 1e9:10,.1f} ns/op")
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+
+        change = result["ops_per_sec"] / old["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append((key, change))
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="4K,1M,16M",
+                        help="comma-separated buffer sizes, with optional K/M/G suffixes (default: 4K,1M,16M)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs of each benchmark (the best is reported)")
+    parser.add_argument("--max-ops", type=int, default=100000, help="maximum number of operations in each run")
+    parser.add_argument("--save", metavar="FILE", help="save the results as a baseline to this JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="compare the results with the baseline in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="fraction of ops/s lost compared to the baseline that counts as a regression (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s]
+    print(f"Python {platform.python_version()} ({platform.python_implementation()}) on {platform.platform()}")
+
+    results = run_benchmarks(sizes, args.filter, args.repeat, args.max_ops)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(), "results": results},
+                      f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+        regressions = compare(results, baseline, args.threshold)
+        for key, change in regressions:
+            print(f"REGRESSION: {key} is {-change:.1%} slower than the baseline")
+
+        if regressions:
+            return 1
+
+        print(f"No regressions beyond {args.threshold:.0%} compared to {args.compare}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,6 @@
 from .binary_reader import BinaryReader, BrStruct, Endian, Whence
+from .stream import BinaryStreamReader, BinaryStreamWriter
+from .aio import AsyncBinaryReader
+from .profiling import ReaderProfiler
+from .parallel import parse_many
+from .cache import StructCache
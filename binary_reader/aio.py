@@ -0,0 +1,340 @@
+from typing import Callable, Tuple, Union
+
+from .binary_reader import COUNTED_STRUCTS, FORMAT_STRUCTS, STRUCTS, BinaryReader, BrStruct, Endian
+
+
+class AsyncBinaryReader:
+    """A reader for binary data that arrives from an asyncio stream (or any other asynchronous byte source).\n
+    Has the same reading API as BinaryReader, but the `read` methods are coroutines that must be awaited.
+    Each read only waits for the bytes it needs, and anything else the source returns is kept in a readahead buffer,
+    so most reads do not have to wait for the source at all.\n
+    The source can only be read forward, so there is no `seek`. BrStruct classes can be read from it if they
+    override `__br_read_async__` or declare `__br_fields__`."""
+    __source: object
+    __iterator: object
+    __readahead: int
+    __buf: bytearray
+    __idx: int
+    __offset: int
+    __at_end: bool
+    __endianness: Endian
+    __structs: dict
+    __counted_structs: Callable
+    __format_structs: Callable
+    __encoding: str
+
+    def __init__(self, source, endianness: Endian = Endian.LITTLE, encoding='utf-8', readahead=1 << 16):
+        """Constructs an AsyncBinaryReader over the given source and sets its position to 0.\n
+        source can be an `asyncio.StreamReader`, any object with a `read(size)` coroutine that returns an empty bytes object
+        at the end of the stream, or an asynchronous iterable of bytes objects.\n
+        readahead is the maximum number of bytes requested from the source at once (reads larger than it request more).\n
+        Default encoding is UTF-8. Will throw an exception if encoding is unknown.
+        """
+        if readahead <= 0:
+            raise ValueError('readahead must be positive')
+
+        self.__source = source
+        self.__iterator = None if hasattr(source, 'read') else source.__aiter__()
+        self.__readahead = readahead
+        self.__buf = bytearray()
+        self.__idx = 0
+        self.__offset = 0
+        self.__at_end = False
+        self.set_endian(endianness)
+        self.set_encoding(encoding)
+
+    async def __next_chunk(self, size: int) -> bytes:
+        if self.__iterator is None:
+            return await self.__source.read(size)
+
+        try:
+            return await self.__iterator.__anext__()
+        except StopAsyncIteration:
+            return b''
+
+    async def __fill(self, size: int) -> bool:
+        # Makes sure that the buffer has at least size bytes after the current position.
+        # Returns False if the source ends first
+        buf = self.__buf
+        if len(buf) - self.__idx >= size:
+            return True
+
+        if self.__idx:
+            # Drop the bytes that were already read, so the buffer does not grow with the stream
+            del buf[:self.__idx]
+            self.__offset += self.__idx
+            self.__idx = 0
+
+        while len(buf) < size and not self.__at_end:
+            chunk = await self.__next_chunk(max(size - len(buf), self.__readahead))
+
+            if chunk:
+                buf += chunk
+            else:
+                self.__at_end = True
+
+        return len(buf) >= size
+
+    async def __ensure(self, size: int) -> None:
+        if not await self.__fill(size):
+            raise Exception(
+                'BinaryReader Error: cannot read farther than end of stream.')
+
+    async def __find(self, token: bytes) -> int:
+        # Returns the index of token in the buffer (filling it as needed), or -1 if the source ends before it is found
+        searched = 0
+
+        while True:
+            start = self.__idx + max(searched - len(token) + 1, 0)
+            end = self.__buf.find(token, start)
+
+            if end != -1:
+                return end
+
+            searched = len(self.__buf) - self.__idx
+            if not await self.__fill(searched + 1):
+                return -1
+
+    def pos(self) -> int:
+        """Returns the number of bytes read from the stream so far."""
+        return self.__offset + self.__idx
+
+    async def eof(self) -> bool:
+        """Returns True if the stream has ended and all of its bytes were read."""
+        return not await self.__fill(1)
+
+    async def skip(self, size: int) -> None:
+        """Reads and discards the given number of bytes."""
+        if size < 0:
+            raise ValueError('size cannot be negative')
+
+        while size > 0:
+            if self.__idx == len(self.__buf) and not await self.__fill(1):
+                raise Exception(
+                    'BinaryReader Error: cannot read farther than end of stream.')
+
+            skipped = min(size, len(self.__buf) - self.__idx)
+            self.__idx += skipped
+            size -= skipped
+
+    async def align_pos(self, size: int) -> int:
+        """Aligns the current position to the given size.\n
+        Skips (size - (current_position % size)) bytes, but only if it is not aligned.\n
+        Returns the number of bytes skipped.
+        """
+        skipped = 0
+
+        if self.pos() % size:
+            skipped = size - (self.pos() % size)
+            await self.skip(skipped)
+
+        return skipped
+
+    def endianness(self) -> Endian:
+        """Returns the endianness of the AsyncBinaryReader."""
+        return self.__endianness
+
+    def set_endian(self, endianness: Endian) -> None:
+        """Sets the endianness of the AsyncBinaryReader."""
+        self.__endianness = endianness
+        self.__structs = STRUCTS[bool(endianness)]
+        self.__counted_structs = COUNTED_STRUCTS[bool(endianness)]
+        self.__format_structs = FORMAT_STRUCTS[bool(endianness)]
+
+    def encoding(self) -> str:
+        """Returns the default encoding of the AsyncBinaryReader."""
+        return self.__encoding
+
+    def set_encoding(self, encoding: str) -> None:
+        """Sets the default encoding of the AsyncBinaryReader when reading strings.\n
+        Will throw an exception if the encoding is unknown.
+        """
+        str.encode('', encoding)
+        self.__encoding = encoding
+
+    async def __read_type(self, format: str, count):
+        st = self.__structs[format] if count is None else self.__counted_structs(format, count)
+
+        if len(self.__buf) - self.__idx < st.size:
+            await self.__ensure(st.size)
+
+        i = self.__idx
+        self.__idx = i + st.size
+        value = st.unpack_from(self.__buf, i)
+
+        return value[0] if count is None else value
+
+    async def read_format(self, format: str) -> tuple:
+        """Reads the values of the given struct format string (for example `"IIf3h"`) with a single call, and returns them as a tuple.\n
+        The format must not start with a byte order character, as the endianness of the AsyncBinaryReader is used.
+        """
+        st = self.__format_structs(format)
+
+        if len(self.__buf) - self.__idx < st.size:
+            await self.__ensure(st.size)
+
+        i = self.__idx
+        self.__idx = i + st.size
+        return st.unpack_from(self.__buf, i)
+
+    async def read_bytes(self, size=1) -> bytes:
+        """Reads a bytes object with the given size from the current position."""
+        if size < 0:
+            raise ValueError('size cannot be negative')
+
+        if len(self.__buf) - self.__idx < size:
+            await self.__ensure(size)
+
+        i = self.__idx
+        self.__idx = i + size
+        return bytes(self.__buf[i:i + size])
+
+    async def read_str(self, size=None, encoding=None) -> str:
+        """Reads a string with the given size from the current position.\n
+        If size is not given, will read until the first null byte (which the position will be set after),
+        or until the end of the stream.\n
+        If encoding is `None` (default), will use the AsyncBinaryReader's encoding.
+        """
+        encode = encoding or self.__encoding
+
+        if size is None:
+            end = await self.__find(b'\x00')
+            i = self.__idx
+
+            if end == -1:
+                end = self.__idx = len(self.__buf)
+            else:
+                self.__idx = end + 1
+
+            return str(self.__buf[i:end], encode)
+
+        return (await self.read_bytes(size)).split(b'\x00', 1)[0].decode(encode)
+
+    async def read_str_to_token(self, token: str, encoding=None) -> str:
+        """Reads a string until a string token is found (or until the end of the stream).\n
+        If encoding is `None` (default), will use the AsyncBinaryReader's encoding.
+        """
+        encode = encoding or self.__encoding
+
+        token_bytes = token.encode(encode)
+        end = await self.__find(token_bytes)
+        i = self.__idx
+
+        if end == -1:
+            end = len(self.__buf)
+        else:
+            end += len(token_bytes)
+
+        self.__idx = end
+
+        null = self.__buf.find(b'\x00', i, end)
+        return str(self.__buf[i:end if null == -1 else null], encode)
+
+    async def read_int64(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads a signed 64-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("q", count)
+
+    async def read_uint64(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads an unsigned 64-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("Q", count)
+
+    async def read_int32(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads a signed 32-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("i", count)
+
+    async def read_uint32(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads an unsigned 32-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("I", count)
+
+    async def read_int16(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads a signed 16-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("h", count)
+
+    async def read_uint16(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads an unsigned 16-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("H", count)
+
+    async def read_int8(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads a signed 8-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("b", count)
+
+    async def read_uint8(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads an unsigned 8-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("B", count)
+
+    async def read_float(self, count=None) -> Union[float, Tuple[float]]:
+        """Reads a 32-bit float.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("f", count)
+
+    async def read_half_float(self, count=None) -> Union[float, Tuple[float]]:
+        """Reads a 16-bit float (half-float).\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return await self.__read_type("e", count)
+
+    async def read_struct(self, cls: type, count=None, *args, stride=None) -> BrStruct:
+        """Creates and returns an instance of the given `cls` after awaiting its `__br_read_async__` method.\n
+        `cls` must be a subclass of BrStruct.\n
+        If count is given, will return a tuple of values instead of 1 value.\n
+        Additional arguments given after `count` will be passed to the `__br_read_async__` method of `cls`.\n
+        If `cls` only overrides `__br_read__`, stride (the size of each element) must be given. Each element is then
+        waited for in full, and read with `__br_read__` from a BinaryReader over its bytes.
+        """
+        if not (cls and issubclass(cls, BrStruct)):
+            raise Exception(
+                f'BinaryReader Error: {cls} is not a subclass of BrStruct.')
+
+        default_read = cls.__br_read_async__ is BrStruct.__br_read_async__
+        schema = cls.__br_schema__
+
+        if count is not None and schema is not None and schema.size and default_read and cls.__br_read__ is BrStruct.__br_read__:
+            # Wait for all of the elements, then decode them at once
+            size = schema.size * count
+            if len(self.__buf) - self.__idx < size:
+                await self.__ensure(size)
+
+            i = self.__idx
+            result = []
+            with memoryview(self.__buf) as view, view[i:i + size] as elements:
+                for values in schema.structs[bool(self.__endianness)].iter_unpack(elements):
+                    br_struct = cls()
+                    schema.unpack(br_struct, values)
+                    result.append(br_struct)
+
+            self.__idx = i + size
+            return tuple(result)
+
+        if count is not None:
+            return tuple([await self.read_struct(cls, None, *args, stride=stride) for _ in range(count)])
+
+        br_struct = cls()
+
+        if default_read and cls.__br_read__ is not BrStruct.__br_read__:
+            if stride is None:
+                raise Exception(
+                    f'BinaryReader Error: {cls} does not override __br_read_async__, so stride must be given.')
+
+            br = BinaryReader.from_buffer(await self.read_bytes(stride), self.__endianness, self.__encoding)
+            br_struct.__br_read__(br, *args)
+        else:
+            await br_struct.__br_read_async__(self, *args)
+
+        return br_struct
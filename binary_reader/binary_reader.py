@@ -3,10 +3,24 @@ __copyright__ = "Copyright 2021, SutandoTsukai181"
 __license__ = "MIT"
 __version__ = "1.4.3"
 
+import mmap
+import os
+import re
 import struct
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
 from contextlib import contextmanager
 from enum import Flag, IntEnum
-from typing import Tuple, Union
+from functools import lru_cache, partial
+from itertools import starmap
+from typing import Callable, Iterator, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 FMT = dict()
 for c in ["b", "B", "s"]:
@@ -18,6 +32,67 @@ for c in ["i", "I", "f"]:
 for c in ["q", "Q"]:
     FMT[c] = 8
 
+# Formats of the types that have `read_` and `write_` methods
+TYPES = {
+    "int8": "b", "uint8": "B",
+    "int16": "h", "uint16": "H", "half_float": "e",
+    "int32": "i", "uint32": "I", "float": "f",
+    "int64": "q", "uint64": "Q",
+    "bytes": "s",
+}
+
+# Precompiled structs for single values, indexed by endianness (True for big endian) and then by format
+STRUCTS = {
+    big: {format: struct.Struct((">" if big else "<") + format) for format in FMT}
+    for big in (False, True)
+}
+
+
+def _counted_struct_cache(end: str) -> Callable[[str, int], struct.Struct]:
+    @lru_cache(maxsize=256)
+    def counted_struct(format: str, count: int) -> struct.Struct:
+        return struct.Struct(end + str(count) + format)
+
+    return counted_struct
+
+
+# Precompiled structs for multiple values, cached by format and count
+COUNTED_STRUCTS = {big: _counted_struct_cache(">" if big else "<") for big in (False, True)}
+
+
+def _format_struct_cache(end: str) -> Callable[[str], struct.Struct]:
+    @lru_cache(maxsize=256)
+    def format_struct(format: str) -> struct.Struct:
+        if format and format[0] in "@=<>!":
+            raise Exception(
+                f'BinaryReader Error: format {format!r} cannot specify a byte order, the endianness of the BinaryReader is used.')
+        return struct.Struct(end + format)
+
+    return format_struct
+
+
+# Compiled structs for format strings given to `read_format`/`write_format`, cached by format
+FORMAT_STRUCTS = {big: _format_struct_cache(">" if big else "<") for big in (False, True)}
+
+# Formats of the types, indexed by the typecodes of array.array and memoryview that have the same kind and size
+COMPACT_FORMATS = dict()
+for codes, formats in (("bhilq", "bhiq"), ("BHILQ", "BHIQ"), ("ef", "ef")):
+    for c in codes:
+        for format in formats:
+            if struct.calcsize(c) == FMT[format]:
+                COMPACT_FORMATS.setdefault(c, format)
+
+# Typecodes of array.array for each format (except half floats, which array.array does not support)
+ARRAY_TYPECODES = dict()
+for c, format in COMPACT_FORMATS.items():
+    if c != "e":
+        ARRAY_TYPECODES.setdefault(format, c)
+
+# Typecodes of array.array used to swap the byte order of elements of each size
+SWAP_TYPECODES = {FMT[format]: ARRAY_TYPECODES[format] for format in "BHIQ"}
+
+HOST_BIG_ENDIAN = sys.byteorder == "big"
+
 
 class Endian(Flag):
     LITTLE = False
@@ -30,10 +105,153 @@ class Whence(IntEnum):
     END = 2
 
 
+@lru_cache(maxsize=64)
+def _search_pattern(sub: bytes) -> 're.Pattern':
+    return re.compile(re.escape(sub))
+
+
+def _readonly_view(buffer) -> memoryview:
+    view = memoryview(buffer)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    return view.toreadonly() if hasattr(view, 'toreadonly') else view
+
+
+def _map_file(f) -> Union[mmap.mmap, None]:
+    if os.fstat(f.fileno()).st_size == 0:
+        # Empty files cannot be mapped
+        return None
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class BrSchema:
+    """Fixed-size layout of a BrStruct subclass, compiled from its `__br_fields__` into a single struct per endianness.\n
+    Each field is a `(name, type)` or `(name, type, count)` tuple. The type can be any name from `TYPES`,
+    `"pad"` for unnamed padding bytes, or another BrStruct subclass that declares `__br_fields__`.\n
+    Fields with a count greater than 1 are read as tuples, except for `"bytes"` where count is the size of the bytes object.
+    """
+
+    def __init__(self, fields) -> None:
+        self.fields = []
+        format = ""
+
+        for field in fields:
+            if not 2 <= len(field) <= 3:
+                raise Exception(
+                    f'BinaryReader Error: invalid field {field!r}, expected (name, type) or (name, type, count).')
+
+            name, kind, count = field if len(field) == 3 else (*field, 1)
+
+            if not isinstance(count, int) or count < 1:
+                raise Exception(f'BinaryReader Error: invalid count for field {name!r}.')
+
+            if isinstance(kind, type) and issubclass(kind, BrStruct):
+                if kind.__br_schema__ is None:
+                    raise Exception(
+                        f'BinaryReader Error: {kind} must declare __br_fields__ to be nested in field {name!r}.')
+                format += kind.__br_schema__.format * count
+            elif kind == "pad":
+                format += str(count) + "x"
+                continue
+            elif kind in TYPES:
+                format += (str(count) if count != 1 or kind == "bytes" else "") + TYPES[kind]
+            else:
+                raise Exception(f'BinaryReader Error: unknown type {kind!r} for field {name!r}.')
+
+            self.fields.append((name, kind, count))
+
+        self.format = format
+        self.structs = {big: struct.Struct((">" if big else "<") + format) for big in (False, True)}
+        self.size = self.structs[False].size
+
+        # Flat schemas can be assigned with a single dict update
+        self.names = tuple(name for name, kind, count in self.fields)
+        self.flat = all(kind in TYPES and (count == 1 or kind == "bytes") for name, kind, count in self.fields)
+        self.__assignable = dict()
+
+    def __dict_assignable(self, cls: type) -> bool:
+        # Fields cannot be assigned through __dict__ if they are slots or properties
+        assignable = self.__assignable.get(cls)
+        if assignable is None:
+            assignable = self.__assignable[cls] = not any(
+                hasattr(getattr(cls, name, None), '__set__') for name in self.names)
+
+        return assignable
+
+    def unpack(self, obj: 'BrStruct', values: tuple, i=0) -> int:
+        """Sets the fields of obj from the unpacked values, starting at index i.\n
+        Returns the index after the last value used.
+        """
+        if self.flat:
+            if i or len(values) != len(self.names):
+                values = values[i:i + len(self.names)]
+
+            if self.__dict_assignable(type(obj)):
+                obj.__dict__.update(zip(self.names, values))
+            else:
+                for name, value in zip(self.names, values):
+                    setattr(obj, name, value)
+
+            return i + len(self.names)
+
+        for name, kind, count in self.fields:
+            if kind in TYPES:
+                if count == 1 or kind == "bytes":
+                    value = values[i]
+                    i += 1
+                else:
+                    value = values[i:i + count]
+                    i += count
+            else:
+                nested = []
+                for _ in range(count):
+                    br_struct = kind()
+                    i = kind.__br_schema__.unpack(br_struct, values, i)
+                    nested.append(br_struct)
+                value = nested[0] if count == 1 else tuple(nested)
+
+            setattr(obj, name, value)
+
+        return i
+
+    def values(self, obj: 'BrStruct', result=None) -> list:
+        """Returns a flat list of the values of obj's fields, in the order they should be packed."""
+        if result is None:
+            result = []
+
+        for name, kind, count in self.fields:
+            value = getattr(obj, name)
+
+            if kind in TYPES:
+                if count == 1 or kind == "bytes":
+                    result.append(value)
+                else:
+                    result.extend(value)
+            elif count == 1:
+                kind.__br_schema__.values(value, result)
+            else:
+                for e in value:
+                    kind.__br_schema__.values(e, result)
+
+        return result
+
+
 class BrStruct:
     """Base class for objects passed to BinaryReader's `read_struct` and `write_struct` methods.\n
     Any type passed to `read_struct` and any object passed to `write_struct` must inherit from this class.\n
-    Override `__br_read__` and `__br_write__` methods from this class to set up BinaryReader to read your classes.\n"""
+    Override `__br_read__` and `__br_write__` methods from this class to set up BinaryReader to read your classes.\n
+    Alternatively, set `__br_fields__` to a sequence of `(name, type[, count])` tuples to declare the fields of a fixed-size struct (see `BrSchema`).
+    All of the declared fields are then read and written with a single struct call, and counted `read_struct`/`write_struct`
+    calls decode/encode all elements in one pass. Overridden `__br_read__` and `__br_write__` methods can call the
+    base class methods to read/write the declared fields before handling the irregular parts of a format.\n"""
+
+    __br_schema__: BrSchema = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+
+        if '__br_fields__' in cls.__dict__:
+            cls.__br_schema__ = BrSchema(cls.__br_fields__)
 
     def __init__(self) -> None:
         """If this class will be used with BinaryReader's `read_struct` method, then this method MUST receive zero arguments after `self`.\n
@@ -47,8 +265,20 @@ class BrStruct:
         This parameter can be used to `read` the attributes of object.\n
         This method can take any number of parameters after the required first parameter.
         The additional arguments corresponding to these parameters should be passed to `BinaryReader.read_struct` after the `count` argument.\n
+        By default, reads the fields declared in `__br_fields__` (if any).
         """
-        pass
+        schema = self.__br_schema__
+        if schema is not None:
+            schema.unpack(self, schema.structs[bool(br.endianness())].unpack(br.read_bytes(schema.size)))
+
+    async def __br_read_async__(self, br: 'AsyncBinaryReader', *args) -> None:
+        """Called once when `AsyncBinaryReader.read_struct` is called on this class.\n
+        Same as `__br_read__`, but the `read` methods of the given AsyncBinaryReader are coroutines that must be awaited.\n
+        By default, reads the fields declared in `__br_fields__` (if any).
+        """
+        schema = self.__br_schema__
+        if schema is not None:
+            schema.unpack(self, schema.structs[bool(br.endianness())].unpack(await br.read_bytes(schema.size)))
 
     def __br_write__(self, br: 'BinaryReader', *args) -> None:
         """Called once when `BinaryReader.write_struct` is called on an instance of this class.\n
@@ -57,37 +287,343 @@ class BrStruct:
         This parameter can be used to `write` the attributes of object.\n
         This method can take any number of parameters after the required first parameter.
         The additional arguments corresponding to these parameters should be passed to `BinaryReader.write_struct` after the `value` argument.\n
+        By default, writes the fields declared in `__br_fields__` (if any).
         """
-        pass
+        schema = self.__br_schema__
+        if schema is not None:
+            br.write_bytes(schema.structs[bool(br.endianness())].pack(*schema.values(self)))
+
+
+class LazyStructArray(Sequence):
+    """A read-only sequence of BrStruct elements that are only read when accessed.\n
+    Returned by `BinaryReader.read_struct` when `lazy` is `True`. Elements are read through a cursor of the BinaryReader
+    (see `BinaryReader.cursor`), so reading them does not move its position, and they are read with the endianness and encoding
+    it had when the LazyStructArray was created.\n
+    The most recently accessed elements are kept in an LRU cache, so accessing them again does not read them again.\n
+    """
+
+    def __init__(self, br: 'BinaryReader', cls: type, count: int, args: tuple, stride=None, cache_size=128) -> None:
+        """Records the offsets of count elements of cls starting at the current position of br, and advances the position after them.\n
+        If stride (the size of each element) is not given, it will be the size of the fields declared by cls
+        (if it has `__br_fields__` and does not override `__br_read__`).
+        Otherwise, all elements are read once to find their offsets.
+        """
+        self.__cursor = br.cursor()
+        self.__cls = cls
+        self.__args = args
+        self.__count = count
+        self.__cache_size = cache_size
+        self.__cache = OrderedDict()
+        self.__start = br.pos()
+
+        schema = cls.__br_schema__
+        if stride is None and schema is not None and cls.__br_read__ is BrStruct.__br_read__:
+            stride = schema.size
+
+        self.__stride = stride
+        self.__offsets = None
+
+        if stride is not None:
+            if self.__start + stride * count > br.size():
+                raise Exception(
+                    'BinaryReader Error: cannot read farther than buffer length.')
+
+            br.seek(self.__start + stride * count)
+        else:
+            self.__offsets = array('Q')
+
+            for i in range(count):
+                self.__offsets.append(br.pos())
+                self.__cache_element(i, br.read_struct(cls, None, *args))
+
+    def __cache_element(self, index: int, element: BrStruct) -> None:
+        cache = self.__cache
+        cache[index] = element
+
+        if len(cache) > self.__cache_size:
+            cache.popitem(last=False)
+
+    def offset(self, index: int) -> int:
+        """Returns the offset of the element at the given index."""
+        if index < 0:
+            index += self.__count
+
+        if not 0 <= index < self.__count:
+            raise IndexError('LazyStructArray index out of range')
+
+        if self.__offsets is not None:
+            return self.__offsets[index]
+        return self.__start + self.__stride * index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(self.__count)))
+
+        offset = self.offset(index)
+        if index < 0:
+            index += self.__count
+
+        element = self.__cache.get(index)
+        if element is not None:
+            self.__cache.move_to_end(index)
+            return element
+
+        self.__cursor.seek(offset)
+        element = self.__cursor.read_struct(self.__cls, None, *self.__args)
+
+        if self.__cache_size > 0:
+            self.__cache_element(index, element)
+
+        return element
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __iter__(self):
+        for i in range(self.__count):
+            yield self[i]
+
+
+class OffsetFixups:
+    """Pending offset fix-ups of a writer, created by its `write_offset_placeholder` and `mark` methods.\n
+    Each placeholder refers to a key, and its value is the position recorded by marking that key, minus the placeholder's base.
+    All placeholders are filled in together when the writer's `resolve_offsets` is called.
+    """
+
+    def __init__(self) -> None:
+        self.pending = []
+        self.marks = dict()
+        self.positions = array('Q')
+
+    @staticmethod
+    def check_type(type: str) -> None:
+        """Throws an exception if type is not an integer type."""
+        if TYPES.get(type, "s") not in "bBhHiIqQ":
+            raise Exception(f'BinaryReader Error: {type!r} is not an integer type.')
+
+    def add(self, pos: int, type: str, key, base: int) -> None:
+        """Records a placeholder of the given integer type at pos."""
+        self.check_type(type)
+
+        self.pending.append((pos, type, key, base))
+        self.positions.append(pos)
+
+    def mark(self, key, pos: int) -> None:
+        """Records pos as the target of the placeholders of key. Each key can only be marked once."""
+        if key in self.marks:
+            raise Exception(f'BinaryReader Error: {key!r} is already marked.')
+
+        self.marks[key] = pos
+
+    def resolve(self) -> list:
+        """Returns a list of (position, type, value) tuples for all pending placeholders, sorted by position.
+        The placeholders stay pending until `clear_pending` is called, so nothing is lost if writing them fails.\n
+        Will throw an exception if a key is not marked, or if a value does not fit in its type.
+        """
+        missing = set(key for pos, type, key, base in self.pending if key not in self.marks)
+        if missing:
+            raise Exception(
+                f'BinaryReader Error: cannot resolve offsets of unmarked keys {", ".join(sorted(map(repr, missing)))}.')
+
+        result = []
+        for pos, type, key, base in self.pending:
+            value = self.marks[key] - base
+            bits = FMT[TYPES[type]] * 8
+            low, high = (-(1 << (bits - 1)), (1 << (bits - 1)) - 1) if TYPES[type].islower() else (0, (1 << bits) - 1)
+
+            if not low <= value <= high:
+                raise Exception(f'BinaryReader Error: offset {value} of {key!r} does not fit in {type}.')
+
+            result.append((pos, type, value))
+
+        result.sort()
+        return result
+
+    def clear_pending(self) -> None:
+        """Removes all pending placeholders, after they were filled in."""
+        self.pending.clear()
+
+
+class ChunkIndex:
+    """Tags, offsets and sizes of the chunks of a container, created by `BinaryReader.build_chunk_index`.\n
+    Chunks can be looked up by their tag and ordinal (the index among the chunks with the same tag).
+    Offsets are relative to the start of the BinaryReader the index was built from, so the index can be used with it,
+    its cursors, and any other BinaryReader over the same data. `rebase` returns a copy of the index for a BinaryReader
+    that starts elsewhere (for example, the parent of the view the index was built from).
+    """
+
+    def __init__(self) -> None:
+        self.tags = []
+        self.offsets = array('Q')
+        self.sizes = array('Q')
+        self.by_tag = dict()
+
+    def add(self, tag, offset: int, size: int) -> None:
+        """Records a chunk with the given tag, offset and size."""
+        self.by_tag.setdefault(tag, []).append(len(self.tags))
+        self.tags.append(tag)
+        self.offsets.append(offset)
+        self.sizes.append(size)
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def __iter__(self) -> Iterator[Tuple[object, int, int]]:
+        return zip(self.tags, self.offsets, self.sizes)
+
+    def __getitem__(self, index: int) -> Tuple[object, int, int]:
+        return self.tags[index], self.offsets[index], self.sizes[index]
+
+    def __contains__(self, tag) -> bool:
+        return tag in self.by_tag
+
+    def count(self, tag) -> int:
+        """Returns the number of chunks with the given tag."""
+        return len(self.by_tag.get(tag, ()))
+
+    def find(self, tag, ordinal=0) -> int:
+        """Returns the index of the chunk with the given tag and ordinal (negative ordinals count from the last one)."""
+        indices = self.by_tag.get(tag)
+        if indices is None:
+            raise KeyError(tag)
+
+        if not -len(indices) <= ordinal < len(indices):
+            raise IndexError('ChunkIndex ordinal out of range')
+
+        return indices[ordinal]
+
+    def offset(self, tag, ordinal=0) -> int:
+        """Returns the offset of the chunk with the given tag and ordinal."""
+        return self.offsets[self.find(tag, ordinal)]
+
+    def size(self, tag, ordinal=0) -> int:
+        """Returns the size of the chunk with the given tag and ordinal."""
+        return self.sizes[self.find(tag, ordinal)]
+
+    def seek(self, br: 'BinaryReader', tag, ordinal=0) -> None:
+        """Seeks br to the start of the chunk with the given tag and ordinal."""
+        br.seek(self.offset(tag, ordinal))
+
+    def view(self, br: 'BinaryReader', tag, ordinal=0, header=0) -> 'BinaryReader':
+        """Returns a view of br over the chunk with the given tag and ordinal, skipping header bytes from its start."""
+        i = self.find(tag, ordinal)
+        return br.view(self.offsets[i] + header, self.sizes[i] - header)
+
+    def rebase(self, offset: int) -> 'ChunkIndex':
+        """Returns a copy of the index with offset added to the offsets of all chunks."""
+        index = ChunkIndex()
+        index.tags = list(self.tags)
+        index.offsets = array('Q', [o + offset for o in self.offsets])
+        index.sizes = array('Q', self.sizes)
+        index.by_tag = {tag: list(indices) for tag, indices in self.by_tag.items()}
+        return index
 
 
 class BinaryReader:
     """A buffer reader/writer containing a mutable bytearray.\n
     Allows reading and writing various data types, while advancing the position of the buffer on each operation."""
-    __buf: bytearray
+    __slots__ = ('__buf', '__idx', '__base', '__end', '__endianness', '__structs', '__counted_structs',
+                 '__format_structs', '__encoding', '__readonly', '__mmap', '__fixups')
+
+    __buf: Union[bytearray, bytes, memoryview, mmap.mmap]
     __idx: int
+    __base: int
+    __end: int
     __endianness: Endian
+    __structs: dict
+    __counted_structs: Callable[[str, int], struct.Struct]
+    __format_structs: Callable[[str], struct.Struct]
     __encoding: str
+    __readonly: bool
+    __mmap: Union[mmap.mmap, None]
+    __fixups: Union[OffsetFixups, None]
 
     def __init__(self, buffer: bytearray = bytearray(), endianness: Endian = Endian.LITTLE, encoding='utf-8'):
         """Constructs a BinaryReader with the given buffer, endianness, and encoding and sets its position to 0.\n
         If buffer is not given, a new bytearray() is created. If endianness is not given, it is set to little endian.\n
-        Default encoding is UTF-8. Will throw an exception if encoding is unknown.
+        Default encoding is UTF-8. Will throw an exception if encoding is unknown.\n
+        The given buffer is always copied. Use `from_buffer` or `from_file` to avoid the copy.
         """
         self.__buf = bytearray(buffer)
-        self.__endianness = endianness
+        self.set_endian(endianness)
         self.__idx = 0
+        self.__base = 0
+        self.__end = len(self.__buf)
+        self.__readonly = False
+        self.__mmap = None
+        self.__fixups = None
         self.set_encoding(encoding)
 
+    @classmethod
+    def from_buffer(cls, buffer, endianness: Endian = Endian.LITTLE, encoding='utf-8') -> 'BinaryReader':
+        """Constructs a read-only BinaryReader over the given buffer without copying it.\n
+        The buffer can be any object supporting the buffer protocol (bytes, bytearray, memoryview, mmap, etc.).\n
+        All `read` methods work normally, but any method that modifies the buffer will throw an exception.\n
+        Changes made to the buffer by its owner will be visible to the BinaryReader.
+        """
+        br = cls.__new__(cls)
+        br.__buf = buffer if isinstance(buffer, (bytes, bytearray, mmap.mmap)) else _readonly_view(buffer)
+        br.set_endian(endianness)
+        br.__idx = 0
+        br.__base = 0
+        br.__end = len(br.__buf)
+        br.__readonly = True
+        br.__mmap = None
+        br.__fixups = None
+        br.set_encoding(encoding)
+
+        return br
+
+    @classmethod
+    def from_file(cls, path, endianness: Endian = Endian.LITTLE, encoding='utf-8', mmap=True) -> 'BinaryReader':
+        """Constructs a BinaryReader from the file at the given path.\n
+        If mmap is `True` (default), the file will be memory-mapped and the BinaryReader will be read-only.
+        The mapping is closed when the BinaryReader is used in a `with` statement and the context is exited.\n
+        If mmap is `False`, the file will be read directly into a new (writable) buffer, without any additional copies.
+        """
+        with open(path, 'rb') as f:
+            if mmap:
+                mapped = _map_file(f)
+                br = cls.from_buffer(mapped if mapped is not None else b'', endianness, encoding)
+                br.__mmap = mapped
+                return br
+
+            buffer = bytearray(os.fstat(f.fileno()).st_size)
+            size = f.readinto(buffer)
+            del buffer[size:]
+
+        br = cls(endianness=endianness, encoding=encoding)
+        br.__buf = buffer
+        br.__end = len(buffer)
+        return br
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.__buf.clear()
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+
+        if self.__readonly:
+            self.__buf = b''
+            self.__base = self.__idx = 0
+        else:
+            self.__buf.clear()
+
+        self.__end = self.__base
+
+    def readonly(self) -> bool:
+        """Returns True if the buffer cannot be modified (for BinaryReaders created by `from_buffer` or `from_file`)."""
+        return self.__readonly
+
+    def __check_writable(self) -> None:
+        if self.__readonly:
+            raise Exception('BinaryReader Error: cannot modify a read-only buffer.')
 
     def pos(self) -> int:
         """Returns the current position in the buffer."""
-        return self.__idx
+        return self.__idx - self.__base
 
     def __past_eof(self, index: int) -> bool:
         return index > self.size()
@@ -102,20 +638,112 @@ class BinaryReader:
 
     def size(self) -> int:
         """Returns the size of the buffer."""
-        return len(self.__buf)
+        return self.__end - self.__base
 
     def buffer(self) -> bytearray:
         """Returns the buffer as a bytearray."""
+        if self.__base or self.__end != len(self.__buf):
+            return bytearray(memoryview(self.__buf)[self.__base:self.__end])
         return bytearray(self.__buf)
 
+    def buffer_view(self) -> memoryview:
+        """Returns a memoryview of the buffer without copying it.\n
+        The view is read-only if the BinaryReader is read-only.\n
+        The buffer cannot be resized (and a memory-mapped file cannot be closed) while the view is still referenced,
+        so `release()` the view when it is no longer needed.
+        """
+        view = _readonly_view(self.__buf) if self.__readonly else memoryview(self.__buf)
+
+        if self.__base or self.__end != view.nbytes:
+            return view[self.__base:self.__end]
+        return view
+
+    def view(self, offset: int = 0, size: int = None, endianness: Endian = None, encoding=None) -> 'BinaryReader':
+        """Returns a read-only BinaryReader over size bytes of the buffer starting at offset, without copying them.\n
+        If size is not given, the view will extend to the end of the buffer.
+        Offsets in the view are relative to its start, and it cannot read or seek outside of its range.\n
+        The view has its own position (starting at 0). Its endianness and encoding are the same as this BinaryReader's, unless they are given.\n
+        Changes to the buffer are visible to the view, but the view should not be used after the buffer is resized or closed.
+        """
+        if size is None:
+            size = self.size() - offset
+
+        if offset < 0 or size < 0 or offset + size > self.size():
+            raise Exception(
+                'BinaryReader Error: cannot create a view farther than buffer length.')
+
+        return self.__sub_reader(self.__base + offset, self.__base + offset + size, endianness, encoding)
+
+    def cursor(self, endianness: Endian = None, encoding=None) -> 'BinaryReader':
+        """Returns a read-only BinaryReader over the same range of the buffer, starting at the current position.\n
+        The cursor has its own position, so it can read independently of this BinaryReader
+        (for example, from a different thread). See `view` for the other details.
+        """
+        br = self.__sub_reader(self.__base, self.__end, endianness, encoding)
+        br.__idx = self.__idx
+        return br
+
+    def __sub_reader(self, base: int, end: int, endianness: Endian, encoding) -> 'BinaryReader':
+        # Views and cursors of a subclass keep its methods, like the readers created by from_buffer
+        cls = type(self)
+        br = cls.__new__(cls)
+        br.__buf = self.__buf
+        br.__idx = br.__base = base
+        br.__end = end
+        br.__readonly = True
+        br.__mmap = None
+        br.__fixups = None
+
+        if endianness is None:
+            br.__endianness = self.__endianness
+            br.__structs = self.__structs
+            br.__counted_structs = self.__counted_structs
+            br.__format_structs = self.__format_structs
+        else:
+            br.set_endian(endianness)
+
+        if encoding is None:
+            br.__encoding = self.__encoding
+        else:
+            br.set_encoding(encoding)
+
+        return br
+
+    def capacity(self) -> int:
+        """Returns the number of bytes that the buffer can hold before it has to be resized."""
+        return len(self.__buf) - self.__base
+
+    def reserve(self, size: int) -> None:
+        """Makes sure that the buffer can hold at least size bytes, so writing up to that size does not resize it.\n
+        Does not change the size of the buffer.
+        """
+        self.__check_writable()
+
+        if size > len(self.__buf):
+            self.__buf.extend(bytes(size - len(self.__buf)))
+
+    def __grow(self, size: int) -> None:
+        # Grows the buffer geometrically, so that appending values does not resize it on every write.
+        # The bytes after the end of the buffer are always 0, so they can be used as padding
+        self.__buf.extend(bytes(max(size, len(self.__buf) + (len(self.__buf) >> 1), 64) - len(self.__buf)))
+
     def pad(self, size: int) -> None:
         """Pads the buffer by 0s with the given size and advances the buffer position.\n
         Will advance the buffer position only if the position was at the end of the buffer.
         """
-        if self.__idx == self.size():
-            self.__idx += size
+        self.__check_writable()
+
+        if size < 0:
+            raise ValueError('size cannot be negative')
+
+        end = self.__end + size
+        if end > len(self.__buf):
+            self.__grow(end)
 
-        self.extend([0] * size)
+        if self.__idx == self.__end:
+            self.__idx = end
+
+        self.__end = end
 
     def align_pos(self, size: int) -> int:
         """Aligns the current position to the given size.\n
@@ -148,7 +776,14 @@ class BinaryReader:
         """Extends the BinaryReader's buffer with the given buffer.\n
         Does not advance buffer position.
         """
-        self.__buf.extend(buffer)
+        self.__check_writable()
+
+        if self.__end == len(self.__buf):
+            self.__buf.extend(buffer)
+            self.__end = len(self.__buf)
+        else:
+            # Write into the reserved capacity
+            self.__write_buffer_at(self.__end, buffer if isinstance(buffer, (bytes, bytearray, memoryview)) else bytes(buffer))
 
     def trim(self, size: int) -> int:
         """Trims the buffer to the given size.\n
@@ -156,13 +791,15 @@ class BinaryReader:
         If the position of the buffer was in the trimmed range, it will be set to the end of the buffer.\n
         Returns the number of bytes removed.
         """
+        self.__check_writable()
         trimmed = 0
 
         if size >= 0:
             trimmed = self.size() - size
 
         if (trimmed > 0):
-            self.__buf = self.__buf[:size]
+            del self.__buf[size:]
+            self.__end = size
             if (self.__idx > size):
                 self.__idx = self.size()
         else:
@@ -177,14 +814,12 @@ class BinaryReader:
         Whence.CUR will seek relative to the current position.\n
         Whence.END will seek relative to the end (offset should be positive).
         """
-        new_offset = self.__idx
-
         if whence == Whence.BEGIN:
             new_offset = offset
         elif whence == Whence.CUR:
-            new_offset = self.__idx + offset
+            new_offset = self.pos() + offset
         elif whence == Whence.END:
-            new_offset = len(self.__buf) - offset
+            new_offset = self.size() - offset
         else:
             raise Exception('BinaryReader Error: invalid whence value.')
 
@@ -192,7 +827,7 @@ class BinaryReader:
             raise Exception(
                 'BinaryReader Error: cannot seek farther than buffer length.')
 
-        self.__idx = new_offset
+        self.__idx = self.__base + new_offset
 
     @contextmanager
     def seek_to(self, offset: int, whence: Whence = Whence.BEGIN) -> 'BinaryReader':
@@ -207,9 +842,20 @@ class BinaryReader:
 
         self.__idx = prev_pos
 
+    def endianness(self) -> Endian:
+        """Returns the endianness of the BinaryReader."""
+        return self.__endianness
+
     def set_endian(self, endianness: Endian) -> None:
         """Sets the endianness of the BinaryReader."""
         self.__endianness = endianness
+        self.__structs = STRUCTS[bool(endianness)]
+        self.__counted_structs = COUNTED_STRUCTS[bool(endianness)]
+        self.__format_structs = FORMAT_STRUCTS[bool(endianness)]
+
+    def encoding(self) -> str:
+        """Returns the default encoding of the BinaryReader."""
+        return self.__encoding
 
     def set_encoding(self, encoding: str) -> None:
         """Sets the default encoding of the BinaryReader when reading/writing strings.\n
@@ -223,17 +869,176 @@ class BinaryReader:
         return hasattr(x, '__iter__') and not isinstance(x, (str, bytes))
 
     def __read_type(self, format: str, count=1):
+        if count == 1:
+            st = self.__structs[format]
+        else:
+            st = self.__counted_structs(format, count)
+
         i = self.__idx
-        new_offset = self.__idx + (FMT[format] * count)
+        new_offset = i + st.size
 
-        end = ">" if self.__endianness else "<"
+        if new_offset > self.__end:
+            raise Exception(
+                'BinaryReader Error: cannot read farther than buffer length.')
 
-        if self.__past_eof(new_offset):
+        self.__idx = new_offset
+        return st.unpack_from(self.__buf, i)
+
+    def __read_one(self, format: str):
+        st = self.__structs[format]
+        i = self.__idx
+        new_offset = i + st.size
+
+        if new_offset > self.__end:
             raise Exception(
                 'BinaryReader Error: cannot read farther than buffer length.')
 
         self.__idx = new_offset
-        return struct.unpack_from(end + str(count) + format, self.__buf, i)
+        return st.unpack_from(self.__buf, i)[0]
+
+    def __finder(self, sub: bytes) -> Callable[[int, int], int]:
+        # Returns a function that finds sub in a range of the buffer. memoryview has no find method,
+        # so a regex search (which also runs over the buffer without copying it) is used instead
+        buf = self.__buf
+        if not isinstance(buf, memoryview):
+            return partial(buf.find, sub)
+
+        search = _search_pattern(sub).search
+
+        def find(start: int, end: int) -> int:
+            match = search(buf, start, end)
+            return match.start() if match else -1
+
+        return find
+
+    def __find(self, sub: bytes, start: int, end: int) -> int:
+        return self.__finder(sub)(start, end)
+
+    def __search_range(self, pattern: bytes, start: int, end: int) -> Tuple[int, int]:
+        if not pattern:
+            raise ValueError('pattern cannot be empty')
+
+        # Offsets are interpreted the same way as in bytes.find
+        start, end, _ = slice(start, end).indices(self.size())
+        return self.__base + start, self.__base + end
+
+    def find(self, pattern: bytes, start=0, end=None) -> int:
+        """Returns the offset of the first occurrence of pattern in the buffer between start and end, or -1 if it is not found.\n
+        If end is not given, will search until the end of the buffer. The position is not changed.
+        """
+        start, end = self.__search_range(pattern, start, end)
+        i = self.__find(pattern, start, end)
+        return i if i == -1 else i - self.__base
+
+    def find_all(self, pattern: bytes, start=0, end=None, overlapping=False) -> Iterator[int]:
+        """Returns an iterator over the offsets of all occurrences of pattern in the buffer between start and end.\n
+        If overlapping is `True`, occurrences that overlap a previous one are included.
+        If end is not given, will search until the end of the buffer. The position is not changed.
+        """
+        start, end = self.__search_range(pattern, start, end)
+        find = self.__finder(pattern)
+        step = 1 if overlapping else len(pattern)
+        base = self.__base
+
+        def find_all():
+            i = find(start, end)
+            while i != -1:
+                yield i - base
+                i = find(i + step, end)
+
+        return find_all()
+
+    def build_chunk_index(self, tag_reader: Callable[['BinaryReader'], Union[Tuple[object, int], None]], start=0, end=None,
+                          align=1, pattern: bytes = None) -> ChunkIndex:
+        """Walks the chunks of a container and returns a ChunkIndex of their tags, offsets and sizes.\n
+        tag_reader is called with a cursor positioned at the start of each chunk, and should read its header and return
+        a `(tag, size)` tuple, where size is the size of the whole chunk (including its header), or `None` if there are no more chunks.
+        The next chunk starts after the end of the chunk, aligned to align bytes relative to the start of this BinaryReader
+        (position 0, which is not the start of the underlying buffer for views).
+        Chunks are walked from start until end (the end of the buffer if it is not given). The position is not changed.\n
+        If pattern is given, chunks are not walked one after the other. Instead, tag_reader is called at each occurrence of pattern
+        (see `find_all`), which is useful for carving chunks out of unstructured data. Occurrences for which tag_reader returns `None`,
+        or a size that does not fit in the buffer, are skipped, and so are occurrences so close to the end of the buffer that
+        tag_reader reads past it.
+        """
+        start, end, _ = slice(start, end).indices(self.size())
+        index = ChunkIndex()
+        br = self.cursor()
+
+        if pattern is not None:
+            for offset in self.find_all(pattern, start, end):
+                br.seek(offset)
+                try:
+                    chunk = tag_reader(br)
+                except Exception as e:
+                    # Matches too close to the end of the buffer cannot have a whole header, so they are not chunks
+                    if 'cannot read farther than buffer length' not in str(e):
+                        raise
+                    continue
+
+                if chunk is not None and 0 < chunk[1] <= end - offset:
+                    index.add(chunk[0], offset, chunk[1])
+
+            return index
+
+        offset = start
+        while offset < end:
+            br.seek(offset)
+            chunk = tag_reader(br)
+
+            if chunk is None:
+                break
+
+            tag, size = chunk
+            if not 0 < size <= end - offset:
+                raise Exception(
+                    f'BinaryReader Error: chunk {tag!r} at offset {offset} has an invalid size {size}.')
+
+            index.add(tag, offset, size)
+            offset += size
+
+            if offset % align:
+                offset += align - offset % align
+
+        return index
+
+    def read_format(self, format: str) -> tuple:
+        """Reads the values of the given struct format string (for example `"IIf3h"`) with a single call, and returns them as a tuple.\n
+        The format must not start with a byte order character, as the endianness of the BinaryReader is used.
+        """
+        st = self.__format_structs(format)
+        i = self.__idx
+        new_offset = i + st.size
+
+        if new_offset > self.__end:
+            raise Exception(
+                'BinaryReader Error: cannot read farther than buffer length.')
+
+        self.__idx = new_offset
+        return st.unpack_from(self.__buf, i)
+
+    def iter_records(self, format: str, count: int, record: Callable = None) -> Iterator[tuple]:
+        """Returns an iterator over count consecutive records of the given struct format string, starting from the current position.\n
+        Each record is unpacked only when the iterator reaches it, so large tables are not held in memory at once.
+        The position is advanced past all of the records immediately.\n
+        If record is given, it will be called with the values of each record (for example, a namedtuple or a dataclass),
+        and the iterator will yield its results instead of tuples.\n
+        The format must not start with a byte order character, as the endianness of the BinaryReader is used.
+        The buffer cannot be resized until the iterator is exhausted or deleted.
+        """
+        st = self.__format_structs(format)
+        i = self.__idx
+        new_offset = i + st.size * count
+
+        if count < 0 or new_offset > self.__end:
+            raise Exception(
+                'BinaryReader Error: cannot read farther than buffer length.')
+
+        self.__idx = new_offset
+
+        # The iterator keeps the view alive and releases it once it is exhausted
+        records = st.iter_unpack(memoryview(self.__buf)[i:new_offset])
+        return records if record is None else starmap(record, records)
 
     def read_bytes(self, size=1) -> bytes:
         """Reads a bytes object with the given size from the current position."""
@@ -247,14 +1052,15 @@ class BinaryReader:
         encode = encoding or self.__encoding
 
         if size is None:
-            string = bytearray()
-            while self.__idx < len(self.__buf):
-                string.append(self.__buf[self.__idx])
-                self.__idx += 1
-                if string[-1] == 0:
-                    break
+            i = self.__idx
+            end = self.__find(b'\x00', i, self.__end)
 
-            return string.split(b'\x00', 1)[0].decode(encode)
+            if end == -1:
+                end = self.__idx = self.__end
+            else:
+                self.__idx = end + 1
+
+            return str(self.__buf[i:end], encode)
 
         if size < 0:
             raise ValueError('size cannot be negative')
@@ -267,19 +1073,76 @@ class BinaryReader:
         """
         encode = encoding or self.__encoding
 
-        i = 0
-        string = bytearray()
         token_bytes = token.encode(encode)
-        token_size = len(token_bytes)
-        while self.__idx < len(self.__buf):
-            string.append(self.__buf[self.__idx])
-            self.__idx += 1
-            if token_bytes == string[i : i + token_size]:
-                break
-            if len(string) >= token_size:
-                i += 1
+        i = self.__idx
+        end = self.__find(token_bytes, i, self.__end)
+
+        if end == -1:
+            end = self.__end
+        else:
+            end += len(token_bytes)
 
-        return string.split(b'\x00', 1)[0].decode(encode)
+        self.__idx = end
+
+        null = self.__find(b'\x00', i, end)
+        return str(self.__buf[i:end if null == -1 else null], encode)
+
+    def read_strs(self, count: int, encoding=None, intern=False) -> Tuple[str]:
+        """Reads the given number of consecutive null-terminated strings, starting from the current position.\n
+        The position will be set after the null byte of the last string.\n
+        If encoding is `None` (default), will use the BinaryReader's encoding.\n
+        If intern is `True`, the strings will be interned with `sys.intern`, so repeated strings share the same object.
+        """
+        encode = encoding or self.__encoding
+        buf = self.__buf
+        size = self.__end
+        find = self.__finder(b'\x00')
+
+        result = []
+        i = self.__idx
+        for _ in range(count):
+            end = find(i, size)
+            if end == -1:
+                end = size
+
+            result.append(str(buf[i:end], encode))
+            i = min(end + 1, size)
+
+        self.__idx = i
+
+        if intern:
+            return tuple(map(sys.intern, result))
+        return tuple(result)
+
+    def read_str_table(self, offsets, base=0, encoding=None, intern=False) -> Tuple[str]:
+        """Reads a null-terminated string at each of the given offsets, relative to base.\n
+        Does not change the current position. Strings at repeated offsets are only decoded once.\n
+        If encoding is `None` (default), will use the BinaryReader's encoding.\n
+        If intern is `True`, the strings will be interned with `sys.intern`, so repeated strings share the same object.
+        """
+        encode = encoding or self.__encoding
+        buf = self.__buf
+        size = self.__end
+        find = self.__finder(b'\x00')
+
+        strings = dict()
+        result = []
+        for offset in offsets:
+            string = strings.get(offset)
+
+            if string is None:
+                i = self.__base + base + offset
+                if i < self.__base or i > size:
+                    raise Exception(
+                        'BinaryReader Error: cannot read farther than buffer length.')
+
+                end = find(i, size)
+                string = str(buf[i:size if end == -1 else end], encode)
+                strings[offset] = sys.intern(string) if intern else string
+
+            result.append(string)
+
+        return tuple(result)
 
     def read_int64(self, count=None) -> Union[int, Tuple[int]]:
         """Reads a signed 64-bit integer.\n
@@ -287,7 +1150,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("q", count)
-        return self.__read_type("q")[0]
+        return self.__read_one("q")
 
     def read_uint64(self, count=None) -> Union[int, Tuple[int]]:
         """Reads an unsigned 64-bit integer.\n
@@ -295,7 +1158,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("Q", count)
-        return self.__read_type("Q")[0]
+        return self.__read_one("Q")
 
     def read_int32(self, count=None) -> Union[int, Tuple[int]]:
         """Reads a signed 32-bit integer.\n
@@ -303,7 +1166,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("i", count)
-        return self.__read_type("i")[0]
+        return self.__read_one("i")
 
     def read_uint32(self, count=None) -> Union[int, Tuple[int]]:
         """Reads an unsigned 32-bit integer.\n
@@ -311,7 +1174,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("I", count)
-        return self.__read_type("I")[0]
+        return self.__read_one("I")
 
     def read_int16(self, count=None) -> Union[int, Tuple[int]]:
         """Reads a signed 16-bit integer.\n
@@ -319,7 +1182,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("h", count)
-        return self.__read_type("h")[0]
+        return self.__read_one("h")
 
     def read_uint16(self, count=None) -> Union[int, Tuple[int]]:
         """Reads an unsigned 16-bit integer.\n
@@ -327,7 +1190,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("H", count)
-        return self.__read_type("H")[0]
+        return self.__read_one("H")
 
     def read_int8(self, count=None) -> Union[int, Tuple[int]]:
         """Reads a signed 8-bit integer.\n
@@ -335,7 +1198,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("b", count)
-        return self.__read_type("b")[0]
+        return self.__read_one("b")
 
     def read_uint8(self, count=None) -> Union[int, Tuple[int]]:
         """Reads an unsigned 8-bit integer.\n
@@ -343,7 +1206,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("B", count)
-        return self.__read_type("B")[0]
+        return self.__read_one("B")
 
     def read_float(self, count=None) -> Union[float, Tuple[float]]:
         """Reads a 32-bit float.\n
@@ -351,7 +1214,7 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("f", count)
-        return self.__read_type("f")[0]
+        return self.__read_one("f")
 
     def read_half_float(self, count=None) -> Union[float, Tuple[float]]:
         """Reads a 16-bit float (half-float).\n
@@ -359,18 +1222,120 @@ class BinaryReader:
         """
         if count is not None:
             return self.__read_type("e", count)
-        return self.__read_type("e")[0]
+        return self.__read_one("e")
+
+    def read_array(self, dtype, shape, copy=False) -> 'np.ndarray':
+        """Reads a numpy array with the given dtype and shape (or number of elements).\n
+        The byte order of dtype is replaced with the endianness of the BinaryReader.\n
+        If the endianness matches the system's, the returned array is a view over the buffer (no copy is made).
+        In that case, the buffer cannot be resized until the array is deleted. If copy is `True`, a new array is always returned.\n
+        Requires numpy to be installed.
+        """
+        if np is None:
+            raise Exception('BinaryReader Error: numpy is required for read_array.')
+
+        dtype = np.dtype(dtype).newbyteorder(">" if self.__endianness else "<")
+        count = int(np.prod(shape))
+
+        i = self.__idx
+        new_offset = i + dtype.itemsize * count
+
+        if new_offset > self.__end:
+            raise Exception(
+                'BinaryReader Error: cannot read farther than buffer length.')
+
+        array = np.frombuffer(self.__buf, dtype, count, i)
+        if not dtype.isnative:
+            array = array.byteswap().view(dtype.newbyteorder("="))
+        elif copy:
+            array = array.copy()
+
+        self.__idx = new_offset
+        return array.reshape(shape)
+
+    def read_compact(self, type: str, count: int, copy=False) -> Union[array, memoryview]:
+        """Reads count values of the given type (any name from `TYPES` except bytes, such as `'uint16'`) without creating
+        a Python object for each of them.\n
+        If the endianness of the BinaryReader matches the system's and copy is `False`, returns a read-only memoryview
+        over the buffer (no copy is made). In that case, the buffer cannot be resized until the view is released.
+        Otherwise, returns an array.array (with the byte order swapped if needed).\n
+        Half floats are returned as an array.array of 32-bit floats, as neither array.array nor memoryview supports them.\n
+        The values can be written back with the `write_` method of the same type, which writes array.array and memoryview
+        objects with a matching typecode without unpacking them.
+        """
+        format = TYPES.get(type)
+        if format is None or format == "s":
+            raise Exception(f'BinaryReader Error: {type!r} cannot be read as a compact array.')
+
+        if count < 0:
+            raise ValueError('count cannot be negative')
+
+        if format == "e":
+            return array("f", self.__read_type(format, count))
+
+        i = self.__idx
+        new_offset = i + FMT[format] * count
+
+        if new_offset > self.__end:
+            raise Exception(
+                'BinaryReader Error: cannot read farther than buffer length.')
+
+        c = ARRAY_TYPECODES[format]
+        swap = bool(self.__endianness) != HOST_BIG_ENDIAN
+
+        if swap or copy:
+            value = array(c)
+            with memoryview(self.__buf) as view, view[i:new_offset] as part:
+                value.frombytes(part)
+
+            if swap:
+                value.byteswap()
+        else:
+            value = _readonly_view(self.__buf)[i:new_offset].cast(c)
 
-    def read_struct(self, cls: type, count=None, *args) -> BrStruct:
+        self.__idx = new_offset
+        return value
+
+    def read_struct(self, cls: type, count=None, *args, lazy=False, stride=None, cache_size=128, workers=None, cache=None) -> BrStruct:
         """Creates and returns an instance of the given `cls` after calling its `__br_read__` method.\n
         `cls` must be a subclass of BrStruct.\n
         If count is given, will return a tuple of values instead of 1 value.\n
         Additional arguments given after `count` will be passed to the `__br_read__` method of `cls`.\n
+        If lazy is `True`, count must be given, and a LazyStructArray will be returned instead of a tuple.
+        Its elements are only read when they are accessed, and up to cache_size of them are cached.
+        stride is the size of each element. If it is not known (see `LazyStructArray`), all elements are read once to find their offsets.\n
+        If workers is given, count must be given, and the elements will be read in parallel by that many worker processes
+        (see `binary_reader.parallel.read_struct_parallel`). This requires the elements to have a known stride.\n
+        If cache is given (a `binary_reader.cache.StructCache`), the result will be returned from it if the same bytes were read before,
+        and stored in it otherwise. cache cannot be used with lazy.
         """
         if not (cls and issubclass(cls, BrStruct)):
             raise Exception(
                 f'BinaryReader Error: {cls} is not a subclass of BrStruct.')
 
+        if cache is not None:
+            if lazy:
+                raise Exception('BinaryReader Error: cache cannot be used when lazy is True.')
+
+            return cache.read_struct(self, cls, count, *args, stride=stride, workers=workers)
+
+        if lazy:
+            if count is None:
+                raise Exception('BinaryReader Error: count must be given when lazy is True.')
+
+            return LazyStructArray(self, cls, count, args, stride, cache_size)
+
+        if workers is not None:
+            if count is None:
+                raise Exception('BinaryReader Error: count must be given when workers is given.')
+
+            from .parallel import read_struct_parallel
+            return read_struct_parallel(self, cls, count, *args, workers=workers, stride=stride)
+
+        schema = cls.__br_schema__
+        if count is not None and schema is not None and schema.size and cls.__br_read__ is BrStruct.__br_read__:
+            return self.__read_schema(cls, schema, count)
+
         if count is not None:
             result = []
 
@@ -386,28 +1351,129 @@ class BinaryReader:
 
         return br_struct
 
+    def __read_schema(self, cls: type, schema: BrSchema, count: int) -> Tuple[BrStruct]:
+        i = self.__idx
+        new_offset = i + schema.size * count
+
+        if new_offset > self.__end:
+            raise Exception(
+                'BinaryReader Error: cannot read farther than buffer length.')
+
+        result = []
+        with memoryview(self.__buf) as view:
+            for values in schema.structs[bool(self.__endianness)].iter_unpack(view[i:new_offset]):
+                br_struct = cls()
+                schema.unpack(br_struct, values)
+                result.append(br_struct)
+
+        self.__idx = new_offset
+        return tuple(result)
+
     def __write_type(self, format: str, value, is_iterable: bool) -> None:
+        self.__check_writable()
         i = self.__idx
 
-        end = ">" if self.__endianness else "<"
+        if is_iterable and isinstance(value, (array, memoryview)):
+            c = value.typecode if isinstance(value, array) else value.format.lstrip("@")
+            if COMPACT_FORMATS.get(c) == format and (isinstance(value, array) or value.c_contiguous):
+                self.__write_compact(value)
+                return
 
-        count = 1
         if is_iterable or type(value) is bytes:
-            count = len(value)
-
-        if i + (FMT[format] * count) > len(self.__buf):
-            self.pad(FMT[format] * count)
+            st = self.__counted_structs(format, len(value))
         else:
-            self.__idx += FMT[format] * count
+            st = self.__structs[format]
+
+        self.__idx = i + st.size
+        if self.__idx > self.__end:
+            if self.__idx > len(self.__buf):
+                self.__grow(self.__idx)
+            self.__end = self.__idx
 
         if is_iterable:
-            struct.pack_into(end + str(count) + format, self.__buf, i, *value)
+            st.pack_into(self.__buf, i, *value)
+        else:
+            st.pack_into(self.__buf, i, value)
+
+    def __write_compact(self, value: Union[array, memoryview]) -> None:
+        # Writes the elements of an array.array or memoryview as they are, or a byte-swapped copy of them
+        if value.itemsize > 1 and bool(self.__endianness) != HOST_BIG_ENDIAN:
+            if isinstance(value, array):
+                value = value[:]
+            else:
+                swapped = array(SWAP_TYPECODES[value.itemsize])
+                swapped.frombytes(_readonly_view(value))
+                value = swapped
+
+            value.byteswap()
+        elif isinstance(value, memoryview):
+            value = _readonly_view(value)
+
+        self.__write_buffer(value)
+
+    def __write_buffer(self, buffer) -> None:
+        self.__check_writable()
+        self.__idx = self.__write_buffer_at(self.__idx, buffer)
+
+    def __write_buffer_at(self, i: int, buffer) -> int:
+        buf = self.__buf
+
+        if i == len(buf):
+            # Appending lets the bytearray grow geometrically by itself
+            buf += buffer
+            new_offset = len(buf)
         else:
-            struct.pack_into(end + str(count) + format, self.__buf, i, value)
+            with memoryview(buffer) as view:
+                new_offset = i + view.nbytes
+
+                if new_offset > len(buf):
+                    self.__grow(new_offset)
+
+                buf[i:new_offset] = view
+
+        if new_offset > self.__end:
+            self.__end = new_offset
+
+        return new_offset
+
+    def write_from(self, buffer, offset=0, size=None) -> None:
+        """Writes size bytes of the given buffer starting at offset, without making intermediate copies.\n
+        The buffer can be any object supporting the buffer protocol (bytes, bytearray, memoryview, mmap, array, etc.).
+        If size is not given, will write until the end of the buffer.
+        """
+        with _readonly_view(buffer) as view:
+            if size is None:
+                size = len(view) - offset
+
+            if offset < 0 or size < 0 or offset + size > len(view):
+                raise Exception(
+                    'BinaryReader Error: cannot write farther than buffer length.')
+
+            with view[offset:offset + size] as part:
+                self.__write_buffer(part)
 
     def write_bytes(self, value: bytes) -> None:
-        """Writes a bytes object to the buffer."""
-        self.__write_type("s", value, is_iterable=False)
+        """Writes a bytes object (or any other object supporting the buffer protocol) to the buffer."""
+        if type(value) is bytes:
+            self.__write_type("s", value, is_iterable=False)
+        else:
+            self.write_from(value)
+
+    def write_format(self, format: str, *values) -> None:
+        """Writes the given values with the given struct format string (for example `"IIf3h"`) with a single call.\n
+        The format must not start with a byte order character, as the endianness of the BinaryReader is used.
+        """
+        self.__check_writable()
+        st = self.__format_structs(format)
+        i = self.__idx
+
+        self.__idx = i + st.size
+        if self.__idx > self.__end:
+            if self.__idx > len(self.__buf):
+                self.__grow(self.__idx)
+            self.__end = self.__idx
+
+        st.pack_into(self.__buf, i, *values)
 
     def write_str(self, string: str, null=False, encoding=None) -> int:
         """Writes a whole string to the buffer.\n
@@ -491,18 +1557,127 @@ class BinaryReader:
         """
         self.__write_type("e", value, self.is_iterable(value))
 
+    def write_array(self, array: 'np.ndarray') -> None:
+        """Writes the elements of a numpy array (or any object that can be converted to one) to the buffer.\n
+        The elements are written in the endianness of the BinaryReader, in C (row-major) order.\n
+        Requires numpy to be installed.
+        """
+        if np is None:
+            raise Exception('BinaryReader Error: numpy is required for write_array.')
+
+        array = np.asarray(array)
+        array = np.ascontiguousarray(array, array.dtype.newbyteorder(">" if self.__endianness else "<"))
+
+        self.__write_buffer(array.reshape(-1).view(np.uint8).data)
+
     def write_struct(self, value: BrStruct, *args) -> None:
         """Calls the given value's `__br_write__` method.\n
         `value` must be an instance of a class that inherits BrStruct.\n
         If value is iterable, will call the `__br_write__` method of all elements in the given iterable.\n
         Additional arguments given after `value` will be passed to the `__br_write__` method of `value`.\n
         """
-        if not isinstance(value, BrStruct) and not (self.is_iterable(value) and all(isinstance(e, BrStruct) for e in value)):
+        if isinstance(value, BrStruct):
+            value.__br_write__(self, *args)
+            return
+
+        if not self.is_iterable(value):
+            raise Exception(
+                f'BinaryReader Error: {value} is not an instance of BrStruct.')
+
+        if not isinstance(value, (list, tuple)):
+            value = tuple(value)
+
+        # Elements of the same class only need to be checked once
+        cls = type(value[0]) if value else BrStruct
+        if not all(type(e) is cls for e in value):
+            cls = None
+
+        if not (cls and issubclass(cls, BrStruct)) and not all(isinstance(e, BrStruct) for e in value):
             raise Exception(
                 f'BinaryReader Error: {value} is not an instance of BrStruct.')
 
-        if self.is_iterable(value):
+        schema = cls.__br_schema__ if cls else None
+        if schema is not None and cls.__br_write__ is BrStruct.__br_write__:
+            self.__write_schema(value, schema)
+        else:
             for s in value:
                 s.__br_write__(self, *args)
-        else:
-            value.__br_write__(self, *args)
+
+    def write_offset_placeholder(self, type: str, key, base=0, relative=False) -> int:
+        """Writes a placeholder for the offset of key, which is filled in by `resolve_offsets` after key is marked with `mark`.\n
+        type can be any integer type (for example `"uint32"`).
+        The offset is relative to base, or to the position of the placeholder if relative is `True`.\n
+        Returns the position of the placeholder.
+        """
+        if self.__fixups is None:
+            self.__fixups = OffsetFixups()
+
+        OffsetFixups.check_type(type)
+
+        # The fix-up is only recorded once the placeholder was written
+        pos = self.pos()
+        self.__write_type(TYPES[type], 0, False)
+        self.__fixups.add(pos, type, key, pos if relative else base)
+
+        return pos
+
+    def mark(self, key) -> int:
+        """Records the current position as the target of the offset placeholders of key, and returns it.\n
+        Each key can only be marked once.
+        """
+        if self.__fixups is None:
+            self.__fixups = OffsetFixups()
+
+        self.__fixups.mark(key, self.pos())
+        return self.pos()
+
+    def resolve_offsets(self) -> int:
+        """Fills in all pending offset placeholders, without changing the current position.\n
+        Will throw an exception (before writing any of them) if a key was not marked, or if an offset does not fit in its type.\n
+        Returns the number of placeholders that were filled in.
+        """
+        if self.__fixups is None:
+            return 0
+
+        self.__check_writable()
+        fixups = self.__fixups.resolve()
+
+        # Placeholders can be out of bounds if the buffer was trimmed after writing them
+        if any(pos + self.__structs[TYPES[type]].size > self.size() for pos, type, value in fixups):
+            raise Exception(
+                'BinaryReader Error: cannot write farther than buffer length.')
+
+        for pos, type, value in fixups:
+            self.__structs[TYPES[type]].pack_into(self.__buf, self.__base + pos, value)
+
+        self.__fixups.clear_pending()
+        return len(fixups)
+
+    def relocations(self) -> Tuple[int]:
+        """Returns the positions of all offset placeholders written so far (resolved or not), sorted."""
+        return tuple(sorted(self.__fixups.positions)) if self.__fixups is not None else ()
+
+    def write_relocation_table(self, type='uint32') -> int:
+        """Writes the positions of all offset placeholders written so far (see `relocations`) as integers of the given type.\n
+        Returns the number of positions written.
+        """
+        relocations = self.relocations()
+        getattr(self, 'write_' + type)(relocations)
+        return len(relocations)
+
+    def __write_schema(self, value, schema: BrSchema) -> None:
+        self.__check_writable()
+        i = self.__idx
+        new_offset = i + schema.size * len(value)
+
+        if new_offset > self.__end:
+            if new_offset > len(self.__buf):
+                self.__grow(new_offset)
+            self.__end = new_offset
+
+        st = schema.structs[bool(self.__endianness)]
+        for s in value:
+            st.pack_into(self.__buf, i, *schema.values(s))
+            i += st.size
+
+        self.__idx = new_offset
@@ -0,0 +1,234 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from enum import Enum
+from typing import Tuple, Union
+
+from .binary_reader import BinaryReader, BrStruct, Whence
+
+CACHE_MAGIC = b'BRSC'
+CACHE_VERSION = 1
+
+# Size of the digests used as keys
+KEY_SIZE = 16
+
+# Types of additional arguments whose repr is the same in every run, so they can be part of the key
+KEY_ARG_TYPES = (type(None), bool, int, float, complex, str, bytes, Enum, type)
+
+
+def _has_stable_repr(value) -> bool:
+    if isinstance(value, (tuple, list)):
+        return all(_has_stable_repr(e) for e in value)
+    if isinstance(value, dict):
+        return all(_has_stable_repr(k) and _has_stable_repr(v) for k, v in value.items())
+    return isinstance(value, KEY_ARG_TYPES)
+
+
+class StructCache:
+    """An LRU cache of the results of `BinaryReader.read_struct`, keyed by a hash of the bytes they were read from.\n
+    The key is a BLAKE2b digest of the class, count, additional arguments, endianness, encoding and version tag, along with:\n
+    - The bytes of the elements, if their size is known (from the `__br_fields__` of the class, or the stride argument).
+      In this case, the elements must not read anything outside of their own bytes.\n
+    - Otherwise, the whole buffer and the current position, so the elements can read from anywhere in the buffer.
+      The whole buffer is hashed for each read, so this is meant for reading the root struct of a file, not for many small reads.\n
+    The additional arguments are part of the key through their repr, so they can only be None, numbers, strings, bytes, enums, classes,
+    and tuples, lists and dicts of these. Other objects (whose repr usually includes their address) raise an exception.\n
+    Hits return the cached result itself (not a copy), so it should not be modified. The size of a result is the size of its
+    pickled data, and the least recently used results are evicted when their total size is larger than max_size bytes.
+    Results that cannot be pickled are returned without being cached, and counted in uncacheable.\n
+    The version tag should be changed whenever the way the structs are read changes, so that old results are not used anymore.\n
+    If a path is given, the cache is loaded from it (if it exists and has the same version tag), and saved to it when it is closed.
+    """
+
+    def __init__(self, max_size=64 << 20, path=None, version=0) -> None:
+        self.__max_size = max_size
+        self.__path = path
+        self.__version = str(version)
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__changed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def size(self) -> int:
+        """Returns the total size of the cached results in bytes."""
+        return self.__size
+
+    def max_size(self) -> int:
+        """Returns the maximum total size of the cached results in bytes."""
+        return self.__max_size
+
+    def version(self) -> str:
+        """Returns the version tag of the cache."""
+        return self.__version
+
+    def __key(self, br: BinaryReader, cls: type, count, args: tuple, size) -> bytes:
+        h = hashlib.blake2b(digest_size=KEY_SIZE)
+        h.update(repr((cls.__module__, cls.__qualname__, count, args, bool(br.endianness()), br.encoding(),
+                       self.__version, size is None)).encode())
+
+        with br.buffer_view() as view:
+            if size is None:
+                h.update(br.pos().to_bytes(8, 'little'))
+                h.update(view)
+            else:
+                pos = br.pos()
+                if pos + size > len(view):
+                    raise Exception(
+                        'BinaryReader Error: cannot read farther than buffer length.')
+
+                with view[pos:pos + size] as elements:
+                    h.update(elements)
+
+        return h.digest()
+
+    def read_struct(self, br: BinaryReader, cls: type, count=None, *args, stride=None, workers=None) -> Union[BrStruct, Tuple[BrStruct]]:
+        """Same as `br.read_struct(cls, count, *args)`, but returns the cached result if the same bytes were read before.\n
+        On a hit, the position of br is advanced by the number of bytes that were read originally.
+        stride and workers are passed to `read_struct` on a miss.
+        """
+        if not (cls and issubclass(cls, BrStruct)):
+            raise Exception(
+                f'BinaryReader Error: {cls} is not a subclass of BrStruct.')
+
+        if not _has_stable_repr(args):
+            raise Exception(
+                f'BinaryReader Error: the arguments {args!r} cannot be part of a cache key.')
+
+        schema = cls.__br_schema__
+        if stride is None and schema is not None and schema.size and cls.__br_read__ is BrStruct.__br_read__:
+            stride = schema.size
+
+        size = None if stride is None else stride * (1 if count is None else count)
+        key = self.__key(br, cls, count, args, size)
+
+        entry = self.__entries.get(key)
+        if entry is not None:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+
+            consumed, size, result, data = entry
+            if result is None:
+                # Results loaded from a file are unpickled when they are first used
+                result = pickle.loads(data)
+                self.__entries[key] = (consumed, size, result, None)
+
+            br.seek(consumed, Whence.CUR)
+            return result
+
+        self.misses += 1
+
+        start = br.pos()
+        result = br.read_struct(cls, count, *args, stride=stride, workers=workers)
+
+        try:
+            size = len(pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            self.uncacheable += 1
+            return result
+
+        self.__add(key, (br.pos() - start, size, result, None))
+
+        return result
+
+    def __add(self, key: bytes, entry: tuple) -> None:
+        size = entry[1]
+        if size > self.__max_size:
+            return
+
+        self.__entries[key] = entry
+        self.__size += size
+        self.__changed = True
+
+        while self.__size > self.__max_size:
+            _, evicted = self.__entries.popitem(last=False)
+            self.__size -= evicted[1]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes all cached results. The statistics are not reset."""
+        self.__changed = self.__changed or bool(self.__entries)
+        self.__entries.clear()
+        self.__size = 0
+
+    def hit_rate(self) -> float:
+        """Returns the fraction of reads that were cache hits."""
+        reads = self.hits + self.misses
+        return self.hits / reads if reads else 0.0
+
+    def report(self) -> str:
+        """Returns the statistics of the cache as a string."""
+        return (f'{self.hits} hits, {self.misses} misses ({self.hit_rate():.1%} hit rate), {self.evictions} evictions, '
+                f'{self.uncacheable} uncacheable, {len(self.__entries)} entries ({self.__size / (1 << 20):.2f} / {self.__max_size / (1 << 20):.2f} MiB)')
+
+    def save(self, path=None) -> None:
+        """Saves the cached results to a file (the path given to the constructor if path is not given), from least to most recently used."""
+        path = self.__path if path is None else path
+        if path is None:
+            raise Exception('BinaryReader Error: no path was given to save the cache to.')
+
+        br = BinaryReader()
+        br.write_bytes(CACHE_MAGIC)
+        br.write_uint32(CACHE_VERSION)
+        br.write_str(self.__version, null=True)
+        br.write_uint32(len(self.__entries))
+
+        for key, (consumed, _, result, data) in self.__entries.items():
+            if data is None:
+                data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+
+            br.write_bytes(key)
+            br.write_int64(consumed)
+            br.write_uint64(len(data))
+            br.write_from(data)
+
+        with open(path, 'wb') as f:
+            f.write(br.buffer_view())
+
+        if path == self.__path:
+            self.__changed = False
+
+    def load(self, path) -> None:
+        """Adds the results saved in a file to the cache. Nothing is loaded if the file was saved with a different version tag."""
+        with BinaryReader.from_file(path) as br:
+            if br.read_bytes(4) != CACHE_MAGIC:
+                raise Exception('BinaryReader Error: not a struct cache file.')
+
+            version = br.read_uint32()
+            if version != CACHE_VERSION:
+                raise Exception(f'BinaryReader Error: unsupported struct cache file version {version}.')
+
+            if br.read_str() != self.__version:
+                return
+
+            for _ in range(br.read_uint32()):
+                key = br.read_bytes(KEY_SIZE)
+                consumed = br.read_int64()
+                data = br.read_bytes(br.read_uint64())
+
+                if key not in self.__entries:
+                    self.__add(key, (consumed, len(data), None, data))
+
+        if path == self.__path:
+            self.__changed = False
+
+    def close(self) -> None:
+        """Saves the cache if a path was given to the constructor and it has changed."""
+        if self.__path is not None and self.__changed:
+            self.save()
@@ -0,0 +1,309 @@
+import bz2
+import io
+import lzma
+import os
+import zlib
+from bisect import bisect_left, bisect_right
+
+from .binary_reader import BinaryReader
+
+INDEX_MAGIC = b'BRCI'
+INDEX_VERSION = 1
+
+# Formats that can be read, and the window bits passed to zlib for the zlib based ones
+FORMATS = ('zlib', 'gzip', 'deflate', 'bz2', 'lzma')
+ZLIB_WBITS = {'zlib': zlib.MAX_WBITS, 'gzip': zlib.MAX_WBITS | 16, 'deflate': -zlib.MAX_WBITS}
+
+# Number of compressed bytes read from the source at once, and maximum number of bytes decompressed at once
+CHUNK_SIZE = 1 << 16
+
+
+def detect_format(header: bytes) -> str:
+    """Returns the compression format of the data starting with the given header, based on its magic bytes.\n
+    Data that does not start with any known magic is assumed to be a raw deflate stream.
+    """
+    if header[:2] == b'\x1f\x8b':
+        return 'gzip'
+    if header[:3] == b'BZh':
+        return 'bz2'
+    if header[:6] == b'\xfd7zXZ\x00' or header[:3] == b'\x5d\x00\x00':
+        return 'lzma'
+    if len(header) >= 2 and header[0] & 0x0F == 8 and (header[0] << 8 | header[1]) % 31 == 0:
+        return 'zlib'
+    return 'deflate'
+
+
+class CompressedFile(io.RawIOBase):
+    """A read-only, seekable file object over the decompressed contents of a compressed file.\n
+    The data is decompressed on demand, so the decompressed data is never kept in memory as a whole.
+    While decompressing, checkpoints of the decompressor are recorded every checkpoint_interval bytes, so seeking backwards
+    (or to an offset that was already passed) resumes from the nearest checkpoint instead of decompressing from the start.\n
+    Checkpoints inside a compressed stream are copies of the decompressor, which are only supported by zlib (zlib, gzip and deflate formats).
+    Each copy takes about 40 KiB, plus up to `CHUNK_SIZE` bytes of input that was not consumed yet. At most max_checkpoints copies are kept:
+    when there are more, checkpoint_interval is doubled and the copies closer than that to the previous checkpoint are dropped.
+    Concatenated streams (e.g. multi-member gzip files) also get a checkpoint at the start of each stream, which only takes a few bytes.\n
+    If an index path is given, the checkpoints at stream starts and the decompressed size are loaded from it (if it exists),
+    and saved to it when the file is closed. Copies of the decompressor cannot be saved, so they are recorded again as the file is read.
+    """
+
+    def __init__(self, source, format='auto', checkpoint_interval=1 << 22, index=None, max_checkpoints=64) -> None:
+        """Constructs a CompressedFile over the given compressed file object or path.\n
+        format can be one of `FORMATS`, or `'auto'` to detect it from the magic bytes of the data.
+        """
+        super().__init__()
+
+        if checkpoint_interval <= 0:
+            raise ValueError('checkpoint_interval must be positive')
+        if max_checkpoints <= 0:
+            raise ValueError('max_checkpoints must be positive')
+
+        self.__owner = not hasattr(source, 'read')
+        self.__source = open(source, 'rb') if self.__owner else source
+        self.__source_start = self.__source.tell()
+
+        if format == 'auto':
+            format = detect_format(self.__source.read(6))
+        elif format not in FORMATS:
+            raise Exception(f'BinaryReader Error: unknown compression format {format!r}.')
+
+        self.__format = format
+        self.__interval = checkpoint_interval
+        self.__max_checkpoints = max_checkpoints
+        self.__index_path = index
+        self.__index_changed = False
+
+        # Checkpoints are sorted by their decompressed offset. Each one has the compressed offset of the next input,
+        # a copy of the decompressor (None for the start of a stream), and the input that was not consumed yet
+        self.__offsets = [0]
+        self.__comp_offsets = [0]
+        self.__states = [None]
+        self.__tails = [b'']
+        self.__size = None
+
+        self.__pos = 0
+        self.__restore(0)
+
+        if index is not None and os.path.exists(index):
+            self.__load_index(index)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def format(self) -> str:
+        """Returns the compression format."""
+        return self.__format
+
+    def __new_decompressor(self):
+        if self.__format in ZLIB_WBITS:
+            return zlib.decompressobj(ZLIB_WBITS[self.__format])
+        if self.__format == 'bz2':
+            return bz2.BZ2Decompressor()
+        return lzma.LZMADecompressor()
+
+    def __restore(self, i: int) -> None:
+        # Resumes decompressing from the checkpoint at index i
+        state = self.__states[i]
+        self.__decompressor = self.__new_decompressor() if state is None else state.copy()
+        self.__out = self.__offsets[i]
+        self.__comp = self.__comp_offsets[i]
+        self.__tail = self.__tails[i]
+        self.__at_end = False
+
+    def __add_checkpoint(self, comp: int, state, tail: bytes) -> None:
+        # Checkpoints at stream starts are always added (unless they already exist),
+        # and copies are only added if they are at least checkpoint_interval bytes away from their neighbors
+        out = self.__out
+        i = bisect_left(self.__offsets, out)
+        found = i < len(self.__offsets) and self.__offsets[i] == out
+
+        if state is None:
+            if found:
+                return
+            self.__index_changed = True
+        elif found or out - self.__offsets[i - 1] < self.__interval or (
+                i < len(self.__offsets) and self.__offsets[i] - out < self.__interval):
+            return
+
+        self.__offsets.insert(i, out)
+        self.__comp_offsets.insert(i, comp)
+        self.__states.insert(i, state if state is None else state.copy())
+        self.__tails.insert(i, tail)
+
+        if state is not None and sum(s is not None for s in self.__states) > self.__max_checkpoints:
+            self.__thin_checkpoints()
+
+    def __thin_checkpoints(self) -> None:
+        # Doubles the checkpoint interval and drops the copies that are now too close to the checkpoint before them
+        self.__interval *= 2
+        keep = [0]
+        for i in range(1, len(self.__offsets)):
+            if self.__states[i] is None or self.__offsets[i] - self.__offsets[keep[-1]] >= self.__interval:
+                keep.append(i)
+
+        self.__offsets = [self.__offsets[i] for i in keep]
+        self.__comp_offsets = [self.__comp_offsets[i] for i in keep]
+        self.__states = [self.__states[i] for i in keep]
+        self.__tails = [self.__tails[i] for i in keep]
+
+    def __read_input(self) -> bytes:
+        self.__source.seek(self.__source_start + self.__comp)
+        data = self.__source.read(CHUNK_SIZE)
+        self.__comp += len(data)
+        return data
+
+    def __decompress(self, size: int) -> bytes:
+        # Returns up to size decompressed bytes, or an empty bytes object at the end of the data
+        d = self.__decompressor
+
+        while not self.__at_end:
+            if d.eof:
+                # Concatenated streams are decompressed one after the other. All of the input after the end of the stream
+                # is in unused_data (zlib also leaves it in unconsumed_tail, so the tail must not be added to it)
+                data = d.unused_data
+                if not data and self.__format not in ('zlib', 'deflate'):
+                    data = self.__read_input()
+
+                if not data or self.__format in ('zlib', 'deflate'):
+                    self.__at_end = True
+                    break
+
+                self.__tail = data
+                d = self.__decompressor = self.__new_decompressor()
+                self.__add_checkpoint(self.__comp - len(data), None, b'')
+
+            if self.__tail:
+                data, self.__tail = self.__tail, b''
+            elif self.__format in ZLIB_WBITS or d.needs_input:
+                data = self.__read_input()
+            else:
+                data = b''
+
+            output = d.decompress(data, size)
+            if self.__format in ZLIB_WBITS:
+                self.__tail = d.unconsumed_tail
+
+            if not (output or data or d.eof):
+                raise Exception('BinaryReader Error: compressed data ended unexpectedly.')
+
+            self.__out += len(output)
+
+            if self.__format in ZLIB_WBITS and not d.eof:
+                self.__add_checkpoint(self.__comp, d, self.__tail)
+
+            if output:
+                return output
+
+        if self.__size is None:
+            self.__size = self.__out
+            self.__index_changed = True
+
+        return b''
+
+    def __seek_to(self, pos: int) -> None:
+        # Moves the decompressor to pos, from the nearest checkpoint before it (or from where it is, if that is closer)
+        i = bisect_right(self.__offsets, pos) - 1
+        if not self.__offsets[i] <= self.__out <= pos:
+            self.__restore(i)
+
+        while self.__out < pos and self.__decompress(min(pos - self.__out, CHUNK_SIZE)):
+            pass
+
+    def readinto(self, b) -> int:
+        if self.__out != self.__pos:
+            self.__seek_to(self.__pos)
+
+        with memoryview(b) as view, view.cast('B') as out:
+            output = self.__decompress(len(out))
+            out[:len(output)] = output
+
+        # Reading past the end returns nothing, and does not move the position back to the end
+        if output:
+            self.__pos = self.__out
+        return len(output)
+
+    def seek(self, offset: int, whence=io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self.__pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size() + offset
+        else:
+            raise ValueError('invalid whence value')
+
+        if pos < 0:
+            raise ValueError('negative seek position')
+
+        self.__pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self.__pos
+
+    def size(self) -> int:
+        """Returns the decompressed size. If it is not known yet, the rest of the data is decompressed (and discarded) to find it."""
+        if self.__size is None:
+            if self.__out < self.__offsets[-1]:
+                self.__restore(len(self.__offsets) - 1)
+
+            while self.__decompress(CHUNK_SIZE):
+                pass
+
+        return self.__size
+
+    def save_index(self, path) -> None:
+        """Saves the checkpoints at stream starts and the decompressed size (if known) to a file, which can be given as index later."""
+        starts = [i for i, state in enumerate(self.__states) if state is None]
+
+        br = BinaryReader()
+        br.write_bytes(INDEX_MAGIC)
+        br.write_uint32(INDEX_VERSION)
+        br.write_str(self.__format, null=True)
+        br.write_int64(-1 if self.__size is None else self.__size)
+        br.write_uint32(len(starts))
+        br.write_uint64([self.__offsets[i] for i in starts])
+        br.write_uint64([self.__comp_offsets[i] for i in starts])
+
+        with open(path, 'wb') as f:
+            f.write(br.buffer_view())
+
+        self.__index_changed = False
+
+    def __load_index(self, path) -> None:
+        with BinaryReader.from_file(path) as br:
+            if br.read_bytes(4) != INDEX_MAGIC:
+                raise Exception('BinaryReader Error: not a compressed file index.')
+
+            version = br.read_uint32()
+            if version != INDEX_VERSION:
+                raise Exception(f'BinaryReader Error: unsupported compressed file index version {version}.')
+
+            if br.read_str() != self.__format:
+                raise Exception('BinaryReader Error: the index was saved for a different compression format.')
+
+            size = br.read_int64()
+            count = br.read_uint32()
+            offsets = br.read_uint64(count)
+            comp_offsets = br.read_uint64(count)
+
+        self.__size = None if size < 0 else size
+        self.__offsets = list(offsets)
+        self.__comp_offsets = list(comp_offsets)
+        self.__states = [None] * count
+        self.__tails = [b''] * count
+        self.__restore(0)
+
+    def close(self) -> None:
+        """Saves the index (if an index path was given and it has changed), and closes the source if it was opened from a path."""
+        if not self.closed:
+            if self.__index_path is not None and self.__index_changed:
+                self.save_index(self.__index_path)
+
+            self.__decompressor = None
+            if self.__owner:
+                self.__source.close()
+
+        super().close()
@@ -0,0 +1,290 @@
+import math
+import os
+import pickle
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, Tuple
+
+from .binary_reader import BinaryReader, BrStruct, Endian
+
+# Reading fewer elements than this is done serially, as starting worker processes would take longer
+PARALLEL_MIN_COUNT = 10000
+
+
+def _read_chunk(name: str, offset: int, cls: type, count: int, args: tuple,
+                endianness: Endian, encoding: str) -> Tuple[BrStruct]:
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # Exiting the reader releases its view of the shared memory so it can be closed, even if reading failed
+        with BinaryReader.from_buffer(shm.buf, endianness, encoding) as br:
+            br.seek(offset)
+            return br.read_struct(cls, count, *args)
+    finally:
+        shm.close()
+
+
+def read_struct_parallel(br: BinaryReader, cls: type, count: int, *args, workers=None, stride=None,
+                         chunk_size=None, executor: Executor = None) -> Tuple[BrStruct]:
+    """Reads count elements of cls from br in worker processes and returns them as a tuple, in order.\n
+    The elements must have a fixed size (stride). If stride is not given, it will be the size of the fields declared by cls
+    (if it has `__br_fields__` and does not override `__br_read__`).\n
+    The bytes of the elements are copied once into shared memory, and each worker process reads chunks of chunk_size elements
+    from it using its own BinaryReader. `cls`, the additional arguments and the returned elements must be picklable.\n
+    If an executor is given, it will be used instead of creating a ProcessPoolExecutor with the given number of workers,
+    and workers should be its number of worker processes (by default, the number of CPUs), which is used to size the chunks.\n
+    Falls back to reading serially if the elements do not have a known size, or if count is less than `PARALLEL_MIN_COUNT`.
+    """
+    schema = cls.__br_schema__
+    if stride is None and schema is not None and cls.__br_read__ is BrStruct.__br_read__:
+        stride = schema.size
+
+    if stride is None or count < PARALLEL_MIN_COUNT or (executor is None and workers is not None and workers <= 1):
+        return br.read_struct(cls, count, *args)
+
+    start = br.pos()
+    size = stride * count
+
+    if start + size > br.size():
+        raise Exception(
+            'BinaryReader Error: cannot read farther than buffer length.')
+
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        with br.buffer_view() as view:
+            shm.buf[:size] = view[start:start + size]
+
+        if chunk_size is None:
+            chunk_size = math.ceil(count / (4 * (workers or os.cpu_count() or 1)))
+
+        pool = executor or ProcessPoolExecutor(workers)
+        try:
+            futures = [
+                pool.submit(_read_chunk, shm.name, i * stride, cls, min(chunk_size, count - i), args,
+                            br.endianness(), br.encoding())
+                for i in range(0, count, chunk_size)
+            ]
+
+            result = []
+            for future in futures:
+                result.extend(future.result())
+        finally:
+            if executor is None:
+                pool.shutdown()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    br.seek(start + size)
+    return tuple(result)
+
+
+class ParseResult:
+    """The result of parsing one file with `parse_many`.\n
+    value is the parsed BrStruct (None if parsing failed), error is the formatted traceback of the exception
+    that was raised while parsing the file (None if it succeeded), and size is the size of the file in bytes.
+    """
+    __slots__ = ('path', 'value', 'error', 'size')
+
+    def __init__(self, path, value: BrStruct, error: str, size: int) -> None:
+        self.path = path
+        self.value = value
+        self.error = error
+        self.size = size
+
+    def __repr__(self) -> str:
+        status = 'failed' if self.error is not None else 'ok'
+        return f'ParseResult({self.path!r}, {status}, {self.size} bytes)'
+
+
+def _parse_file(path, cls: type, args: tuple, endianness: Endian, encoding: str, pickled=False) -> ParseResult:
+    size = 0
+    try:
+        with BinaryReader.from_file(path, endianness, encoding) as br:
+            size = br.size()
+            value = br.read_struct(cls, None, *args)
+
+        # Values are pickled here instead of by the pool, so values that cannot be pickled fail for this file only.
+        # The pool then only has to send the pickled bytes, which are unpickled by _unpickle_values
+        if pickled:
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        return ParseResult(path, value, None, size)
+    except Exception:
+        return ParseResult(path, None, traceback.format_exc(), size)
+
+
+def _parse_files(paths: list, cls: type, args: tuple, endianness: Endian, encoding: str) -> List[ParseResult]:
+    return [_parse_file(path, cls, args, endianness, encoding, True) for path in paths]
+
+
+def _unpickle_values(results: List[ParseResult]) -> List[ParseResult]:
+    for result in results:
+        if result.error is None:
+            try:
+                result.value = pickle.loads(result.value)
+            except Exception:
+                result.value = None
+                result.error = traceback.format_exc()
+
+    return results
+
+
+class ParseMany:
+    """An iterator over the results of `parse_many`, which also records its throughput.\n
+    Yields a ParseResult for each file. The statistics cover the results that were yielded so far.
+    """
+
+    def __init__(self, results: Iterator[ParseResult]) -> None:
+        self.__results = results
+        self.__start = None
+        self.__end = None
+        self.__errors = []
+
+        self.files = 0
+        self.failed = 0
+        self.bytes = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> ParseResult:
+        if self.__start is None:
+            self.__start = time.perf_counter()
+
+        result = next(self.__results)
+
+        self.files += 1
+        self.bytes += result.size
+        if result.error is not None:
+            self.failed += 1
+            self.__errors.append(result)
+
+        self.__end = time.perf_counter()
+        return result
+
+    def errors(self) -> List[ParseResult]:
+        """Consumes the remaining results, and returns the ones that failed (including the ones that were already yielded)."""
+        for _ in self:
+            pass
+
+        return list(self.__errors)
+
+    def seconds(self) -> float:
+        """Returns the time from the first request for a result until the last result was yielded."""
+        if self.__start is None:
+            return 0.0
+        return self.__end - self.__start
+
+    def files_per_sec(self) -> float:
+        """Returns the number of files parsed per second."""
+        return self.files / self.seconds() if self.seconds() else 0.0
+
+    def mb_per_sec(self) -> float:
+        """Returns the number of megabytes (MiB) parsed per second."""
+        return self.bytes / (1 << 20) / self.seconds() if self.seconds() else 0.0
+
+    def report(self) -> str:
+        """Returns the statistics as human-readable text."""
+        return (f'{self.files:,d} files ({self.failed:,d} failed), {self.bytes / (1 << 20):,.1f} MiB in {self.seconds():.2f} s: '
+                f'{self.files_per_sec():,.1f} files/s, {self.mb_per_sec():,.1f} MiB/s')
+
+
+def parse_many(paths: Iterable, cls: type, *args, workers=None, chunksize=16, ordered=True,
+               endianness: Endian = Endian.LITTLE, encoding='utf-8', executor: Executor = None) -> ParseMany:
+    """Parses each of the given files as an instance of cls in worker processes, and returns an iterator over the results.\n
+    Each file is memory-mapped (see `BinaryReader.from_file`) and read with `read_struct(cls, None, *args)`.
+    Workers receive chunksize paths at a time. `cls`, the additional arguments and the returned values must be picklable,
+    and the values must not keep references to the mapped buffer (e.g. lazy arrays or numpy views).\n
+    The returned ParseMany yields a ParseResult for each file, in the order of paths if ordered is `True`, otherwise as they complete.
+    Exceptions raised while parsing a file (including values that cannot be pickled) are stored in its result instead of being raised.
+    If a worker process crashes, each file of the chunk it was parsing gets a result with the error.
+    Only a few chunks are submitted ahead of the results that are consumed, so paths can be a lazy iterable.\n
+    If an executor is given, it will be used instead of creating a ProcessPoolExecutor with the given number of workers
+    (by default, the number of CPUs), and workers should be its number of worker processes, which limits the chunks submitted ahead.
+    Otherwise, if workers is 1, the files are parsed in this process.
+    """
+    if not (cls and issubclass(cls, BrStruct)):
+        raise Exception(
+            f'BinaryReader Error: {cls} is not a subclass of BrStruct.')
+
+    if chunksize <= 0:
+        raise ValueError('chunksize must be positive')
+
+    if executor is None and workers == 1:
+        return ParseMany(_parse_file(path, cls, args, endianness, encoding) for path in paths)
+
+    return ParseMany(_parse_in_pool(paths, cls, args, workers, chunksize, ordered, endianness, encoding, executor))
+
+
+def _chunks(paths: Iterable, chunksize: int) -> Iterator[list]:
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _parse_in_pool(paths: Iterable, cls: type, args: tuple, workers, chunksize: int, ordered: bool,
+                   endianness: Endian, encoding: str, executor: Executor) -> Iterator[ParseResult]:
+    pool = executor or ProcessPoolExecutor(workers)
+    max_pending = 4 * (workers or os.cpu_count() or 1)
+
+    chunks = _chunks(paths, chunksize)
+    pending = deque()
+    submitted = {}
+
+    def submit() -> bool:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+
+        try:
+            future = pool.submit(_parse_files, chunk, cls, args, endianness, encoding)
+        except Exception as e:
+            # A broken pool does not accept new work, so the chunk fails like the ones that were running
+            future = Future()
+            future.set_exception(e)
+
+        pending.append(future)
+        submitted[future] = chunk
+        return True
+
+    try:
+        while len(pending) < max_pending and submit():
+            pass
+
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+
+            chunk = submitted.pop(future)
+            submit()
+
+            try:
+                results = _unpickle_values(future.result())
+            except Exception:
+                # The chunk could not be parsed at all (e.g. the worker process crashed)
+                error = traceback.format_exc()
+                results = [ParseResult(path, None, error, 0) for path in chunk]
+
+            yield from results
+    finally:
+        for future in pending:
+            future.cancel()
+
+        if executor is None:
+            pool.shutdown()
@@ -0,0 +1,303 @@
+import time
+from array import array
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import List, Tuple
+
+from .binary_reader import BinaryReader, BrStruct, Whence
+
+TRACE_MAGIC = b'BRTR'
+TRACE_VERSION = 1
+
+
+def _distance_bucket(distance: int) -> int:
+    # Signed power of 2 that is at least the absolute distance
+    if distance == 0:
+        return 0
+    return (1 << (abs(distance) - 1).bit_length()) * (1 if distance > 0 else -1)
+
+
+class ReaderProfiler:
+    """Records how a BinaryReader (or BinaryStreamReader/BinaryStreamWriter) is used.\n
+    The profiler wraps the reader and should be used in its place. It forwards every call to the reader, and records:\n
+    - The number of calls and bytes read/written for each `read_*`/`write_*` method.\n
+    - The number of seeks, and a histogram of their distances (rounded up to powers of 2).\n
+    - The number of `read_struct` calls and the time spent in them for each BrStruct subclass, and the same for `write_struct`
+      (including nested structs, which are also recorded separately).\n
+    - The accesses that are not sequential (do not start where the previous one ended), and the accessed pages.\n
+    - If trace is `True`, the offset, size and method of every access, which can be saved with `dump_trace`.\n
+    The reader itself is not modified, so there is no cost when the profiler is not used.
+    """
+
+    def __init__(self, br: BinaryReader, trace=False, page_size=4096) -> None:
+        self.__br = br
+        self.__page_size = page_size
+        self.__last_end = None
+
+        self.calls = Counter()
+        self.bytes = Counter()
+        self.seeks = 0
+        self.seek_distances = Counter()
+        self.struct_read_calls = Counter()
+        self.struct_read_times = defaultdict(float)
+        self.struct_write_calls = Counter()
+        self.struct_write_times = defaultdict(float)
+        self.sequential = 0
+        self.non_sequential = 0
+        self.backward = 0
+        self.pages = Counter()
+
+        self.tracing = trace
+        self.trace_methods = []
+        self.__method_ids = dict()
+        self.trace_offsets = array('Q')
+        self.trace_sizes = array('Q')
+        self.trace_kinds = array('H')
+
+    def reader(self) -> BinaryReader:
+        """Returns the wrapped reader."""
+        return self.__br
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        attr = getattr(self.__br, name)
+
+        if callable(attr) and name.startswith(('read_', 'write_')):
+            attr = self.__wrap(name, attr)
+
+            # Cache the wrapper, so __getattr__ is not called again for it
+            self.__dict__[name] = attr
+
+        return attr
+
+    def __wrap(self, name: str, method):
+        br = self.__br
+
+        def wrapper(*args, **kwargs):
+            offset = br.pos()
+            result = method(*args, **kwargs)
+            self.__record(name, offset, br.pos() - offset)
+            return result
+
+        wrapper.__name__ = name
+        wrapper.__doc__ = method.__doc__
+        return wrapper
+
+    def __record(self, name: str, offset: int, size: int) -> None:
+        self.calls[name] += 1
+        self.bytes[name] += size
+
+        if self.__last_end is not None:
+            if offset == self.__last_end:
+                self.sequential += 1
+            else:
+                self.non_sequential += 1
+                if offset < self.__last_end:
+                    self.backward += 1
+
+        self.__last_end = offset + size
+        self.pages[offset // self.__page_size] += 1
+
+        if self.tracing:
+            kind = self.__method_ids.get(name)
+            if kind is None:
+                kind = self.__method_ids[name] = len(self.trace_methods)
+                self.trace_methods.append(name)
+
+            self.trace_offsets.append(offset)
+            self.trace_sizes.append(size)
+            self.trace_kinds.append(kind)
+
+    def __record_seek(self, prev_pos: int) -> None:
+        self.seeks += 1
+        self.seek_distances[_distance_bucket(self.__br.pos() - prev_pos)] += 1
+
+    def seek(self, offset: int, whence: Whence = Whence.BEGIN) -> None:
+        """Same as the reader's `seek`, and records the seek distance."""
+        prev_pos = self.__br.pos()
+        self.__br.seek(offset, whence)
+        self.__record_seek(prev_pos)
+
+    @contextmanager
+    def seek_to(self, offset: int, whence: Whence = Whence.BEGIN) -> 'ReaderProfiler':
+        """Same as the reader's `seek_to`, and records the seek distance.\n
+        Will return a reference of the profiler to be used for `as` in the `with` statement.
+        """
+        prev_pos = self.__br.pos()
+
+        with self.__br.seek_to(offset, whence):
+            self.__record_seek(prev_pos)
+            yield self
+
+    def read_struct(self, cls: type, count=None, *args, **kwargs) -> BrStruct:
+        """Same as the reader's `read_struct`, and records the time spent in it.\n
+        Nested structs are read through the profiler, so they are recorded as well.
+        """
+        if not (cls and issubclass(cls, BrStruct)):
+            raise Exception(
+                f'BinaryReader Error: {cls} is not a subclass of BrStruct.')
+
+        # Lazy, parallel and declarative reads do not call any methods of the profiler
+        direct = kwargs or (cls.__br_schema__ is not None and cls.__br_read__ is BrStruct.__br_read__)
+
+        if count is not None and not direct:
+            return tuple(self.read_struct(cls, None, *args) for _ in range(count))
+
+        start = time.perf_counter()
+        offset = self.__br.pos()
+
+        try:
+            if direct:
+                result = self.__br.read_struct(cls, count, *args, **kwargs)
+            else:
+                result = cls()
+                result.__br_read__(self, *args)
+        finally:
+            self.struct_read_calls[cls.__qualname__] += 1
+            self.struct_read_times[cls.__qualname__] += time.perf_counter() - start
+
+        if direct:
+            self.__record('read_struct', offset, self.__br.pos() - offset)
+
+        return result
+
+    def write_struct(self, value: BrStruct, *args) -> None:
+        """Same as the reader's `write_struct`, and records the time spent in it.\n
+        Nested structs are written through the profiler, so they are recorded as well.
+        """
+        if BinaryReader.is_iterable(value):
+            for s in value:
+                self.write_struct(s, *args)
+            return
+
+        if not isinstance(value, BrStruct):
+            raise Exception(
+                f'BinaryReader Error: {value} is not an instance of BrStruct.')
+
+        cls = type(value)
+        start = time.perf_counter()
+        try:
+            value.__br_write__(self, *args)
+        finally:
+            self.struct_write_calls[cls.__qualname__] += 1
+            self.struct_write_times[cls.__qualname__] += time.perf_counter() - start
+
+    def trace(self) -> List[Tuple[int, int, str]]:
+        """Returns the recorded trace as a list of (offset, size, method name) tuples."""
+        methods = self.trace_methods
+        return [(offset, size, methods[kind])
+                for offset, size, kind in zip(self.trace_offsets, self.trace_sizes, self.trace_kinds)]
+
+    def dump_trace(self, path) -> None:
+        """Saves the recorded trace to a compact binary file, which can be loaded with `load_trace`."""
+        br = BinaryReader()
+        br.write_bytes(TRACE_MAGIC)
+        br.write_uint32(TRACE_VERSION)
+        br.write_uint32(len(self.trace_methods))
+        for name in self.trace_methods:
+            br.write_str(name, null=True)
+
+        br.write_uint64(len(self.trace_offsets))
+        br.write_uint64(self.trace_offsets)
+        br.write_uint64(self.trace_sizes)
+        br.write_uint16(self.trace_kinds)
+
+        with open(path, 'wb') as f:
+            f.write(br.buffer_view())
+
+    def summary(self, top=10) -> dict:
+        """Returns a summary of the recorded statistics as a dictionary (which can be serialized to JSON).\n
+        top is the number of hot pages to include.
+        """
+        accesses = self.sequential + self.non_sequential
+
+        return {
+            'calls': dict(self.calls.most_common()),
+            'bytes': dict(self.bytes.most_common()),
+            'seeks': self.seeks,
+            'seek_distances': {str(k): v for k, v in sorted(self.seek_distances.items())},
+            'struct_reads': {
+                name: {'calls': self.struct_read_calls[name], 'seconds': self.struct_read_times[name]}
+                for name in sorted(self.struct_read_times, key=self.struct_read_times.get, reverse=True)
+            },
+            'struct_writes': {
+                name: {'calls': self.struct_write_calls[name], 'seconds': self.struct_write_times[name]}
+                for name in sorted(self.struct_write_times, key=self.struct_write_times.get, reverse=True)
+            },
+            'sequential_accesses': self.sequential,
+            'non_sequential_accesses': self.non_sequential,
+            'backward_accesses': self.backward,
+            'sequential_ratio': self.sequential / accesses if accesses else 1.0,
+            'page_size': self.__page_size,
+            'hot_pages': [
+                {'offset': page * self.__page_size, 'accesses': count} for page, count in self.pages.most_common(top)
+            ],
+        }
+
+    def report(self, top=10) -> str:
+        """Returns the summary as human-readable text."""
+        summary = self.summary(top)
+        lines = ['Method calls:']
+
+        for name, calls in summary['calls'].items():
+            lines.append(f'  {name:24s} {calls:12,d} calls {summary["bytes"][name]:16,d} bytes')
+
+        lines.append(f'Seeks: {summary["seeks"]:,d}')
+        for distance, count in summary['seek_distances'].items():
+            distance = int(distance)
+            if distance == 0:
+                label = 'none'
+            else:
+                label = f'{"forward" if distance > 0 else "back"} <= {abs(distance):,d}'
+            lines.append(f'  {label:24s} {count:12,d} seeks')
+
+        for title, key in (('Struct reads:', 'struct_reads'), ('Struct writes:', 'struct_writes')):
+            lines.append(title)
+            for name, stats in summary[key].items():
+                lines.append(f'  {name:24s} {stats["calls"]:12,d} calls {stats["seconds"]:12.6f} s')
+
+        lines.append(f'Accesses: {summary["sequential_accesses"]:,d} sequential, '
+                     f'{summary["non_sequential_accesses"]:,d} non-sequential '
+                     f'({summary["backward_accesses"]:,d} backward)')
+
+        lines.append(f'Hot pages ({summary["page_size"]} bytes):')
+        for page in summary['hot_pages']:
+            lines.append(f'  0x{page["offset"]:X}: {page["accesses"]:,d} accesses')
+
+        return '\n'.join(lines)
+
+
+def load_trace(path) -> List[Tuple[int, int, str]]:
+    """Loads a trace saved by `ReaderProfiler.dump_trace` as a list of (offset, size, method name) tuples."""
+    with BinaryReader.from_file(path) as br:
+        if br.read_bytes(4) != TRACE_MAGIC:
+            raise Exception('BinaryReader Error: not a trace file.')
+
+        version = br.read_uint32()
+        if version != TRACE_VERSION:
+            raise Exception(f'BinaryReader Error: unsupported trace version {version}.')
+
+        methods = [br.read_str() for _ in range(br.read_uint32())]
+
+        count = br.read_uint64()
+        offsets = br.read_uint64(count)
+        sizes = br.read_uint64(count)
+        kinds = br.read_uint16(count)
+
+    return [(offset, size, methods[kind]) for offset, size, kind in zip(offsets, sizes, kinds)]
+
+
+def replay_trace(trace: List[Tuple[int, int, str]], br: BinaryReader) -> float:
+    """Replays the accesses of a trace on the given reader by reading the same byte ranges in the same order.\n
+    Write accesses are skipped. Returns the number of seconds it took.
+    """
+    start = time.perf_counter()
+
+    for offset, size, name in trace:
+        if not name.startswith('write_'):
+            br.seek(offset)
+            br.read_bytes(size)
+
+    return time.perf_counter() - start
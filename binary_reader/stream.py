@@ -0,0 +1,915 @@
+import io
+import os
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Iterator, Tuple, Union
+
+from .binary_reader import FMT, FORMAT_STRUCTS, TYPES, BinaryReader, BrStruct, Endian, OffsetFixups, Whence, np
+
+
+class BinaryStreamReader:
+    """A reader for binary files that are too large to be loaded into memory.\n
+    Only a window of the file is kept in memory, which is refilled from the file on demand.
+    Has the same reading API as BinaryReader, so BrStruct classes can be read from it without changes.\n
+    Reads are done with positional reads (`os.pread`) when the file has a file descriptor,
+    otherwise the file object is seeked before each read, so it must be seekable."""
+    __file: io.IOBase
+    __fd: Union[int, None]
+    __owner: bool
+    __window_size: int
+    __window: BinaryReader
+    __data: bytes
+    __start: int
+    __at_end: bool
+    __idx: int
+    __size: Union[int, None]
+    __endianness: Endian
+    __encoding: str
+
+    def __init__(self, file: io.IOBase, endianness: Endian = Endian.LITTLE, encoding='utf-8', window=1 << 20):
+        """Constructs a BinaryStreamReader over the given binary file object and sets its position to 0.\n
+        window is the number of bytes read from the file at once. Reads larger than the window will read more bytes as needed.\n
+        Default encoding is UTF-8. Will throw an exception if encoding is unknown.
+        """
+        if window <= 0:
+            raise ValueError('window must be positive')
+
+        self.__file = file
+        self.__fd = None
+        self.__owner = False
+        self.__window_size = window
+        self.__start = 0
+        self.__at_end = False
+        self.__idx = 0
+        self.__size = None
+        self.__data = b''
+        self.__window = BinaryReader.from_buffer(self.__data, endianness, encoding)
+        self.__endianness = endianness
+        self.__encoding = encoding
+
+        if hasattr(os, 'pread'):
+            try:
+                self.__fd = file.fileno()
+            except (AttributeError, OSError):
+                pass
+
+    @classmethod
+    def from_file(cls, path, endianness: Endian = Endian.LITTLE, encoding='utf-8', window=1 << 20) -> 'BinaryStreamReader':
+        """Opens the file at the given path and constructs a BinaryStreamReader over it.\n
+        The file is closed when `close` is called or when the BinaryStreamReader is used in a `with` statement and the context is exited.
+        """
+        br = cls(open(path, 'rb', buffering=0), endianness, encoding, window)
+        br.__owner = True
+        return br
+
+    @classmethod
+    def from_compressed(cls, source, format='auto', endianness: Endian = Endian.LITTLE, encoding='utf-8', window=1 << 20,
+                        checkpoint_interval=1 << 22, index=None, max_checkpoints=64) -> 'BinaryStreamReader':
+        """Constructs a BinaryStreamReader over the decompressed contents of the given compressed file object or path.\n
+        The data is decompressed on demand, and seeking resumes from the nearest decompressor checkpoint.
+        See `binary_reader.compressed.CompressedFile` for the details of format, checkpoint_interval, index and max_checkpoints.\n
+        The CompressedFile is closed (and the index is saved) when `close` is called or when the BinaryStreamReader
+        is used in a `with` statement and the context is exited.
+        """
+        from .compressed import CompressedFile
+
+        br = cls(CompressedFile(source, format, checkpoint_interval, index, max_checkpoints), endianness, encoding, window)
+        br.__owner = True
+        return br
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Releases the window, and closes the file if it was opened by `from_file` or `from_compressed`."""
+        self.__data = b''
+        self.__window = BinaryReader.from_buffer(self.__data, self.__endianness, self.__encoding)
+        self.__start = self.__idx
+        self.__at_end = False
+
+        if self.__owner:
+            self.__file.close()
+
+    def __read_at(self, offset: int, size: int) -> bytes:
+        chunks = []
+
+        if self.__fd is None:
+            self.__file.seek(offset)
+
+        while size > 0:
+            if self.__fd is not None:
+                chunk = os.pread(self.__fd, size, offset)
+            else:
+                chunk = self.__file.read(size)
+
+            if not chunk:
+                break
+
+            chunks.append(chunk)
+            offset += len(chunk)
+            size -= len(chunk)
+
+        return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+    def __ensure(self, size: int) -> BinaryReader:
+        # Returns the window, positioned at the current position and containing at least size bytes after it (unless the file ends first)
+        window = self.__window
+        rel = self.__idx - self.__start
+
+        if rel < 0 or rel + size > window.size():
+            if rel >= 0 and self.__at_end:
+                # The window already reaches the end of the file
+                window.seek(rel)
+                return window
+
+            size = max(size, self.__window_size)
+            data = self.__read_at(self.__idx, size)
+
+            self.__data = data
+            window = self.__window = BinaryReader.from_buffer(data, self.__endianness, self.__encoding)
+            self.__start = self.__idx
+            self.__at_end = len(data) < size
+            rel = 0
+
+        window.seek(rel)
+        return window
+
+    def __ensure_token(self, token: bytes) -> BinaryReader:
+        # Returns the window, positioned at the current position and containing the first occurrence of token after it (unless the file ends first)
+        size = self.__window_size
+
+        while True:
+            window = self.__ensure(size)
+            rel = window.pos()
+
+            if self.__at_end or self.__data.find(token, rel) != -1:
+                return window
+
+            size = max(2 * (window.size() - rel), self.__window_size)
+
+    def __advance(self, window: BinaryReader) -> None:
+        self.__idx = self.__start + window.pos()
+
+    def pos(self) -> int:
+        """Returns the current position in the file."""
+        return self.__idx
+
+    def __past_eof(self, index: int) -> bool:
+        if 0 <= index - self.__start <= self.__window.size():
+            return False
+
+        if self.__size is None and self.__fd is None and index > 0:
+            # Finding the size of a file without a descriptor can be slow (e.g. for compressed files),
+            # so only check that there is a byte before index
+            return not self.__read_at(index - 1, 1)
+        return index > self.size()
+
+    def past_eof(self) -> bool:
+        """Returns True if the current position is after the end of file."""
+        return self.__past_eof(self.pos())
+
+    def eof(self) -> bool:
+        """Returns True if the current position is at/after the end of file."""
+        return self.__past_eof(self.pos() + 1)
+
+    def size(self) -> int:
+        """Returns the size of the file.\n
+        The size is only determined once, so the file should not be resized while it is being read.
+        """
+        if self.__size is None:
+            if self.__fd is not None:
+                self.__size = os.fstat(self.__fd).st_size
+            else:
+                self.__size = self.__file.seek(0, io.SEEK_END)
+
+        return self.__size
+
+    def align_pos(self, size: int) -> int:
+        """Aligns the current position to the given size.\n
+        Advances the current position by (size - (current_position % size)), but only if it is not aligned.\n
+        Returns the number of bytes skipped.
+        """
+        skipped = 0
+
+        if self.pos() % size:
+            skipped = size - (self.pos() % size)
+            self.seek(skipped, Whence.CUR)
+
+        return skipped
+
+    def seek(self, offset: int, whence: Whence = Whence.BEGIN) -> None:
+        """Changes the current position of the file by the given offset.\n
+        The seek is determined relative to the whence:\n
+        Whence.BEGIN will seek relative to the start.\n
+        Whence.CUR will seek relative to the current position.\n
+        Whence.END will seek relative to the end (offset should be positive).
+        """
+        new_offset = self.__idx
+
+        if whence == Whence.BEGIN:
+            new_offset = offset
+        elif whence == Whence.CUR:
+            new_offset = self.__idx + offset
+        elif whence == Whence.END:
+            new_offset = self.size() - offset
+        else:
+            raise Exception('BinaryReader Error: invalid whence value.')
+
+        if new_offset < 0 or self.__past_eof(new_offset):
+            raise Exception(
+                'BinaryReader Error: cannot seek farther than buffer length.')
+
+        self.__idx = new_offset
+
+    @contextmanager
+    def seek_to(self, offset: int, whence: Whence = Whence.BEGIN) -> 'BinaryStreamReader':
+        """Same as `seek(offset, whence)`, but can be used with the `with` statement in a new context.\n
+        Upon returning to the old context, the original position of the file before the `with` statement will be restored.\n
+        Will return a reference of the BinaryStreamReader to be used for `as` in the `with` statement.
+        """
+        prev_pos = self.__idx
+        self.seek(offset, whence)
+        yield self
+
+        self.__idx = prev_pos
+
+    def endianness(self) -> Endian:
+        """Returns the endianness of the BinaryStreamReader."""
+        return self.__endianness
+
+    def encoding(self) -> str:
+        """Returns the default encoding of the BinaryStreamReader."""
+        return self.__encoding
+
+    def set_endian(self, endianness: Endian) -> None:
+        """Sets the endianness of the BinaryStreamReader."""
+        self.__endianness = endianness
+        self.__window.set_endian(endianness)
+
+    def set_encoding(self, encoding: str) -> None:
+        """Sets the default encoding of the BinaryStreamReader when reading strings.\n
+        Will throw an exception if the encoding is unknown.
+        """
+        self.__window.set_encoding(encoding)
+        self.__encoding = encoding
+
+    def __read_type(self, format: str, count, read):
+        window = self.__ensure(FMT[format] * (1 if count is None else count))
+        value = read(window, count)
+        self.__advance(window)
+        return value
+
+    def read_format(self, format: str) -> tuple:
+        """Reads the values of the given struct format string (for example `"IIf3h"`) with a single call, and returns them as a tuple.\n
+        The format must not start with a byte order character, as the endianness of the BinaryStreamReader is used.
+        """
+        window = self.__ensure(FORMAT_STRUCTS[False](format).size)
+        value = window.read_format(format)
+        self.__advance(window)
+        return value
+
+    def iter_records(self, format: str, count: int, record: Callable = None) -> Iterator[tuple]:
+        """Returns an iterator over count consecutive records of the given struct format string, starting from the current position.\n
+        All of the records are read from the file at once, but each one is only unpacked when the iterator reaches it.
+        See `BinaryReader.iter_records` for the other details.
+        """
+        window = self.__ensure(FORMAT_STRUCTS[False](format).size * max(count, 0))
+        value = window.iter_records(format, count, record)
+        self.__advance(window)
+        return value
+
+    def read_bytes(self, size=1) -> bytes:
+        """Reads a bytes object with the given size from the current position."""
+        window = self.__ensure(size)
+        value = window.read_bytes(size)
+        self.__advance(window)
+        return value
+
+    def read_str(self, size=None, encoding=None) -> str:
+        """Reads a string with the given size from the current position.\n
+        If size is not given, will read until the first null byte (which the position will be set after).\n
+        If encoding is `None` (default), will use the BinaryStreamReader's encoding.
+        """
+        if size is None:
+            window = self.__ensure_token(b'\x00')
+        else:
+            window = self.__ensure(max(size, 0))
+
+        value = window.read_str(size, encoding)
+        self.__advance(window)
+        return value
+
+    def read_str_to_token(self, token: str, encoding=None) -> str:
+        """Reads a string until a string token is found.\n
+        If encoding is `None` (default), will use the BinaryStreamReader's encoding.
+        """
+        window = self.__ensure_token(token.encode(encoding or self.__encoding))
+        value = window.read_str_to_token(token, encoding)
+        self.__advance(window)
+        return value
+
+    def read_strs(self, count: int, encoding=None, intern=False) -> Tuple[str]:
+        """Reads the given number of consecutive null-terminated strings, starting from the current position.\n
+        See `BinaryReader.read_strs` for the other details.
+        """
+        result = []
+        for _ in range(count):
+            window = self.__ensure_token(b'\x00')
+            result.extend(window.read_strs(1, encoding, intern))
+            self.__advance(window)
+
+        return tuple(result)
+
+    def read_str_table(self, offsets, base=0, encoding=None, intern=False) -> Tuple[str]:
+        """Reads a null-terminated string at each of the given offsets, relative to base.\n
+        Does not change the current position. See `BinaryReader.read_str_table` for the other details.
+        """
+        prev_pos = self.__idx
+        strings = dict()
+        result = []
+
+        try:
+            for offset in offsets:
+                string = strings.get(offset)
+
+                if string is None:
+                    i = base + offset
+                    if i < 0 or self.__past_eof(i):
+                        raise Exception(
+                            'BinaryReader Error: cannot read farther than file length.')
+
+                    self.__idx = i
+                    string = strings[offset] = self.__ensure_token(b'\x00').read_strs(1, encoding, intern)[0]
+
+                result.append(string)
+        finally:
+            self.__idx = prev_pos
+
+        return tuple(result)
+
+    def read_int64(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads a signed 64-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("q", count, BinaryReader.read_int64)
+
+    def read_uint64(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads an unsigned 64-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("Q", count, BinaryReader.read_uint64)
+
+    def read_int32(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads a signed 32-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("i", count, BinaryReader.read_int32)
+
+    def read_uint32(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads an unsigned 32-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("I", count, BinaryReader.read_uint32)
+
+    def read_int16(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads a signed 16-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("h", count, BinaryReader.read_int16)
+
+    def read_uint16(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads an unsigned 16-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("H", count, BinaryReader.read_uint16)
+
+    def read_int8(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads a signed 8-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("b", count, BinaryReader.read_int8)
+
+    def read_uint8(self, count=None) -> Union[int, Tuple[int]]:
+        """Reads an unsigned 8-bit integer.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("B", count, BinaryReader.read_uint8)
+
+    def read_float(self, count=None) -> Union[float, Tuple[float]]:
+        """Reads a 32-bit float.\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("f", count, BinaryReader.read_float)
+
+    def read_half_float(self, count=None) -> Union[float, Tuple[float]]:
+        """Reads a 16-bit float (half-float).\n
+        If count is given, will return a tuple of values instead of 1 value.
+        """
+        return self.__read_type("e", count, BinaryReader.read_half_float)
+
+    def read_array(self, dtype, shape) -> 'np.ndarray':
+        """Reads a numpy array with the given dtype and shape (or number of elements).\n
+        The byte order of dtype is replaced with the endianness of the BinaryStreamReader.
+        The returned array is always a copy, as the window it is read from is replaced when it is refilled.\n
+        Requires numpy to be installed.
+        """
+        if np is None:
+            raise Exception('BinaryReader Error: numpy is required for read_array.')
+
+        window = self.__ensure(np.dtype(dtype).itemsize * int(np.prod(shape)))
+        value = window.read_array(dtype, shape, copy=True)
+        self.__advance(window)
+        return value
+
+    def read_compact(self, type: str, count: int) -> array:
+        """Reads count values of the given type (any name from `TYPES` except bytes, such as `'uint16'`) without creating
+        a Python object for each of them, and returns them as an array.array.\n
+        See `BinaryReader.read_compact` for the other details.
+        """
+        window = self.__ensure(FMT.get(TYPES.get(type), 0) * max(count, 0))
+        value = window.read_compact(type, count, copy=True)
+        self.__advance(window)
+        return value
+
+    def read_struct(self, cls: type, count=None, *args) -> BrStruct:
+        """Creates and returns an instance of the given `cls` after calling its `__br_read__` method.\n
+        `cls` must be a subclass of BrStruct.\n
+        If count is given, will return a tuple of values instead of 1 value.\n
+        Additional arguments given after `count` will be passed to the `__br_read__` method of `cls`.\n
+        """
+        if not (cls and issubclass(cls, BrStruct)):
+            raise Exception(
+                f'BinaryReader Error: {cls} is not a subclass of BrStruct.')
+
+        schema = cls.__br_schema__
+        if count is not None and schema is not None and cls.__br_read__ is BrStruct.__br_read__:
+            # Decode all of the elements from the window at once
+            window = self.__ensure(schema.size * count)
+            result = window.read_struct(cls, count)
+            self.__advance(window)
+            return result
+
+        if count is not None:
+            result = []
+
+            for _ in range(count):
+                br_struct = cls()
+                br_struct.__br_read__(self, *args)
+                result.append(br_struct)
+
+            return tuple(result)
+
+        br_struct = cls()
+        br_struct.__br_read__(self, *args)
+
+        return br_struct
+
+
+class BinaryStreamWriter:
+    """A writer for binary files that are too large to be built in memory.\n
+    Written bytes are buffered in memory and flushed to the file once the buffer reaches the window size.
+    Has the same writing API as BinaryReader, so BrStruct classes can be written to it without changes.\n
+    Seeking back to already flushed bytes (e.g. to patch a header) is supported: writes to them are done in place in the file.
+    Positional writes (`os.pwrite`) are used when the file has a file descriptor,
+    otherwise the file object is seeked before each write, so it must be seekable.\n
+    The file is expected to be empty, and its contents are only complete after `flush` or `close` is called."""
+    __file: io.IOBase
+    __fd: Union[int, None]
+    __owner: bool
+    __window_size: int
+    __tail: BinaryReader
+    __flushed: int
+    __idx: int
+    __endianness: Endian
+    __encoding: str
+    __fixups: OffsetFixups
+
+    def __init__(self, file: io.IOBase, endianness: Endian = Endian.LITTLE, encoding='utf-8', window=1 << 20):
+        """Constructs a BinaryStreamWriter over the given binary file object and sets its position to 0.\n
+        window is the number of buffered bytes that triggers a flush to the file.\n
+        Default encoding is UTF-8. Will throw an exception if encoding is unknown.
+        """
+        if window <= 0:
+            raise ValueError('window must be positive')
+
+        self.__file = file
+        self.__fd = None
+        self.__owner = False
+        self.__window_size = window
+        self.__tail = BinaryReader(endianness=endianness, encoding=encoding)
+        self.__flushed = 0
+        self.__idx = 0
+        self.__endianness = endianness
+        self.__encoding = encoding
+        self.__fixups = OffsetFixups()
+
+        if hasattr(os, 'pwrite'):
+            try:
+                self.__fd = file.fileno()
+            except (AttributeError, OSError):
+                pass
+
+    @classmethod
+    def from_file(cls, path, endianness: Endian = Endian.LITTLE, encoding='utf-8', window=1 << 20) -> 'BinaryStreamWriter':
+        """Creates (or truncates) the file at the given path and constructs a BinaryStreamWriter over it.\n
+        The file is flushed and closed when `close` is called or when the BinaryStreamWriter is used in a `with` statement and the context is exited.
+        """
+        br = cls(open(path, 'wb', buffering=0), endianness, encoding, window)
+        br.__owner = True
+        return br
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Flushes the buffered bytes, and closes the file if it was opened by `from_file`."""
+        self.flush()
+
+        if self.__owner:
+            self.__file.close()
+
+    def __write_at(self, offset: int, data) -> None:
+        data = memoryview(data)
+
+        if self.__fd is None:
+            self.__file.seek(offset)
+
+        while data:
+            if self.__fd is not None:
+                written = os.pwrite(self.__fd, data, offset)
+            else:
+                written = self.__file.write(data)
+
+            data = data[written:]
+            offset += written
+
+    def flush(self) -> None:
+        """Writes all of the buffered bytes to the file."""
+        if self.__tail.size():
+            with self.__tail.buffer_view() as view:
+                self.__write_at(self.__flushed, view)
+
+            self.__flushed += self.__tail.size()
+            self.__tail.trim(0)
+
+        if self.__fd is None:
+            self.__file.flush()
+
+    def __write(self, write, *args):
+        if self.__idx >= self.__flushed:
+            tail = self.__tail
+            tail.seek(self.__idx - self.__flushed)
+            result = write(tail, *args)
+            self.__idx = self.__flushed + tail.pos()
+
+            if tail.size() >= self.__window_size:
+                self.flush()
+
+            return result
+
+        # The position is in the flushed part of the file, so encode the value separately and patch it in place
+        scratch = BinaryReader(endianness=self.__endianness, encoding=self.__encoding)
+        result = write(scratch, *args)
+        data = bytes(scratch.buffer())
+
+        flushed = self.__flushed - self.__idx
+        self.__write_at(self.__idx, data[:flushed])
+        if len(data) > flushed:
+            self.__tail.seek(0)
+            self.__tail.write_bytes(data[flushed:])
+
+        self.__idx += len(data)
+        return result
+
+    def pos(self) -> int:
+        """Returns the current position in the file."""
+        return self.__idx
+
+    def __past_eof(self, index: int) -> bool:
+        return index > self.size()
+
+    def past_eof(self) -> bool:
+        """Returns True if the current position is after the end of file."""
+        return self.__past_eof(self.pos())
+
+    def eof(self) -> bool:
+        """Returns True if the current position is at/after the end of file."""
+        return self.__past_eof(self.pos() + 1)
+
+    def size(self) -> int:
+        """Returns the size of the file, including the buffered bytes."""
+        return self.__flushed + self.__tail.size()
+
+    def pad(self, size: int) -> None:
+        """Pads the file by 0s with the given size and advances the position.\n
+        Will advance the position only if the position was at the end of the file.
+        """
+        if size < 0:
+            raise ValueError('size cannot be negative')
+
+        if self.__idx == self.size():
+            self.__idx += size
+
+        self.extend(bytes(size))
+
+    def align_pos(self, size: int) -> int:
+        """Aligns the current position to the given size.\n
+        Advances the current position by (size - (current_position % size)), but only if it is not aligned.\n
+        Returns the number of bytes skipped.
+        """
+        skipped = 0
+
+        if self.pos() % size:
+            skipped = size - (self.pos() % size)
+            self.seek(skipped, Whence.CUR)
+
+        return skipped
+
+    def align(self, size: int) -> int:
+        """Aligns the file to the given size.\n
+        Extends the file from its end by (size - (file_size % size)), but only if it is not aligned.\n
+        Will advance the position only if the position was at the end of the file.\n
+        Returns the number of bytes padded.
+        """
+        pad = 0
+
+        if self.size() % size:
+            pad = size - (self.size() % size)
+            self.pad(pad)
+
+        return pad
+
+    def extend(self, buffer: bytearray) -> None:
+        """Extends the file with the given buffer.\n
+        Does not advance the position.
+        """
+        self.__tail.extend(buffer)
+
+        if self.__tail.size() >= self.__window_size:
+            self.flush()
+
+    def trim(self, size: int) -> int:
+        """Trims the file to the given size.\n
+        If size is greater than the file's size, no bytes will be removed.\n
+        If the position was in the trimmed range, it will be set to the end of the file.\n
+        Returns the number of bytes removed.
+        """
+        trimmed = 0
+
+        if size >= 0:
+            trimmed = self.size() - size
+
+        if trimmed > 0:
+            if size < self.__flushed:
+                self.__tail.trim(0)
+                self.__file.truncate(size)
+                self.__flushed = size
+            else:
+                self.__tail.trim(size - self.__flushed)
+
+            if self.__idx > size:
+                self.__idx = self.size()
+        else:
+            trimmed = 0
+
+        return trimmed
+
+    def seek(self, offset: int, whence: Whence = Whence.BEGIN) -> None:
+        """Changes the current position of the file by the given offset.\n
+        The seek is determined relative to the whence:\n
+        Whence.BEGIN will seek relative to the start.\n
+        Whence.CUR will seek relative to the current position.\n
+        Whence.END will seek relative to the end (offset should be positive).
+        """
+        new_offset = self.__idx
+
+        if whence == Whence.BEGIN:
+            new_offset = offset
+        elif whence == Whence.CUR:
+            new_offset = self.__idx + offset
+        elif whence == Whence.END:
+            new_offset = self.size() - offset
+        else:
+            raise Exception('BinaryReader Error: invalid whence value.')
+
+        if self.__past_eof(new_offset) or new_offset < 0:
+            raise Exception(
+                'BinaryReader Error: cannot seek farther than buffer length.')
+
+        self.__idx = new_offset
+
+    @contextmanager
+    def seek_to(self, offset: int, whence: Whence = Whence.BEGIN) -> 'BinaryStreamWriter':
+        """Same as `seek(offset, whence)`, but can be used with the `with` statement in a new context.\n
+        Upon returning to the old context, the original position of the file before the `with` statement will be restored.\n
+        Will return a reference of the BinaryStreamWriter to be used for `as` in the `with` statement.
+        """
+        prev_pos = self.__idx
+        self.seek(offset, whence)
+        yield self
+
+        self.__idx = prev_pos
+
+    def endianness(self) -> Endian:
+        """Returns the endianness of the BinaryStreamWriter."""
+        return self.__endianness
+
+    def set_endian(self, endianness: Endian) -> None:
+        """Sets the endianness of the BinaryStreamWriter."""
+        self.__tail.set_endian(endianness)
+        self.__endianness = endianness
+
+    def set_encoding(self, encoding: str) -> None:
+        """Sets the default encoding of the BinaryStreamWriter when writing strings.\n
+        Will throw an exception if the encoding is unknown.
+        """
+        self.__tail.set_encoding(encoding)
+        self.__encoding = encoding
+
+    def write_bytes(self, value: bytes) -> None:
+        """Writes a bytes object to the file."""
+        self.__write(BinaryReader.write_bytes, value)
+
+    def write_format(self, format: str, *values) -> None:
+        """Writes the given values with the given struct format string (for example `"IIf3h"`) with a single call.\n
+        The format must not start with a byte order character, as the endianness of the BinaryStreamWriter is used.
+        """
+        self.__write(BinaryReader.write_format, format, *values)
+
+    def write_str(self, string: str, null=False, encoding=None) -> int:
+        """Writes a whole string to the file.\n
+        If null is `True`, will append a null byte (`0x00`) after the string.\n
+        If encoding is `None` (default), will use the BinaryStreamWriter's encoding.\n
+        Returns the number of bytes written (including the null byte if it was added).
+        """
+        return self.__write(BinaryReader.write_str, string, null, encoding)
+
+    def write_str_fixed(self, string: str, size: int, encoding=None) -> None:
+        """Writes a whole string with the given size to the file.\n
+        If the string's size after being encoded is less than size, the remaining size will be filled with null bytes.\n
+        If it's more than size, the encoded bytes will be trimmed to size.\n
+        If encoding is `None` (default), will use the BinaryStreamWriter's encoding.
+        """
+        self.__write(BinaryReader.write_str_fixed, string, size, encoding)
+
+    def write_int64(self, value: int) -> None:
+        """Writes a signed 64-bit integer.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_int64, value)
+
+    def write_uint64(self, value: int) -> None:
+        """Writes an unsigned 64-bit integer.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_uint64, value)
+
+    def write_int32(self, value: int) -> None:
+        """Writes a signed 32-bit integer.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_int32, value)
+
+    def write_uint32(self, value: int) -> None:
+        """Writes an unsigned 32-bit integer.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_uint32, value)
+
+    def write_int16(self, value: int) -> None:
+        """Writes a signed 16-bit integer.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_int16, value)
+
+    def write_uint16(self, value: int) -> None:
+        """Writes an unsigned 16-bit integer.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_uint16, value)
+
+    def write_int8(self, value: int) -> None:
+        """Writes a signed 8-bit integer.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_int8, value)
+
+    def write_uint8(self, value: int) -> None:
+        """Writes an unsigned 8-bit integer.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_uint8, value)
+
+    def write_float(self, value: float) -> None:
+        """Writes a 32-bit float.\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_float, value)
+
+    def write_half_float(self, value: float) -> None:
+        """Writes a 16-bit float (half-float).\n
+        If value is iterable, will write all of the elements in the given iterable.
+        """
+        self.__write(BinaryReader.write_half_float, value)
+
+    def write_array(self, array) -> None:
+        """Writes the elements of a numpy array (or any object that can be converted to one) to the file.\n
+        The elements are written in the endianness of the BinaryStreamWriter, in C (row-major) order.\n
+        Requires numpy to be installed.
+        """
+        self.__write(BinaryReader.write_array, array)
+
+    def write_offset_placeholder(self, type: str, key, base=0, relative=False) -> int:
+        """Writes a placeholder for the offset of key, which is filled in by `resolve_offsets` after key is marked with `mark`.\n
+        type can be any integer type (for example `"uint32"`).
+        The offset is relative to base, or to the position of the placeholder if relative is `True`.\n
+        Returns the position of the placeholder.
+        """
+        OffsetFixups.check_type(type)
+
+        # The fix-up is only recorded once the placeholder was written
+        pos = self.__idx
+        self.__write(getattr(BinaryReader, 'write_' + type), 0)
+        self.__fixups.add(pos, type, key, pos if relative else base)
+
+        return pos
+
+    def mark(self, key) -> int:
+        """Records the current position as the target of the offset placeholders of key, and returns it.\n
+        Each key can only be marked once.
+        """
+        self.__fixups.mark(key, self.__idx)
+        return self.__idx
+
+    def resolve_offsets(self) -> int:
+        """Fills in all pending offset placeholders, without changing the current position.
+        Placeholders that were already flushed are written in place in the file.\n
+        Will throw an exception (before writing any of them) if a key was not marked, or if an offset does not fit in its type.\n
+        Returns the number of placeholders that were filled in.
+        """
+        fixups = self.__fixups.resolve()
+        prev_pos = self.__idx
+
+        if any(pos + FMT[TYPES[type]] > self.size() for pos, type, value in fixups):
+            raise Exception(
+                'BinaryReader Error: cannot write farther than file length.')
+
+        try:
+            for pos, type, value in fixups:
+                self.__idx = pos
+                self.__write(getattr(BinaryReader, 'write_' + type), value)
+        finally:
+            self.__idx = prev_pos
+
+        self.__fixups.clear_pending()
+        return len(fixups)
+
+    def relocations(self) -> Tuple[int]:
+        """Returns the positions of all offset placeholders written so far (resolved or not), sorted."""
+        return tuple(sorted(self.__fixups.positions))
+
+    def write_relocation_table(self, type='uint32') -> int:
+        """Writes the positions of all offset placeholders written so far (see `relocations`) as integers of the given type.\n
+        Returns the number of positions written.
+        """
+        relocations = self.relocations()
+        getattr(self, 'write_' + type)(relocations)
+        return len(relocations)
+
+    def write_struct(self, value: BrStruct, *args) -> None:
+        """Calls the given value's `__br_write__` method.\n
+        `value` must be an instance of a class that inherits BrStruct.\n
+        If value is iterable, will call the `__br_write__` method of all elements in the given iterable.\n
+        Additional arguments given after `value` will be passed to the `__br_write__` method of `value`.\n
+        """
+        if isinstance(value, BrStruct):
+            value.__br_write__(self, *args)
+            return
+
+        if not BinaryReader.is_iterable(value):
+            raise Exception(
+                f'BinaryReader Error: {value} is not an instance of BrStruct.')
+
+        # Iterators would be consumed by the checks below, so they are collected first
+        if not isinstance(value, (list, tuple)):
+            value = tuple(value)
+
+        if not all(isinstance(e, BrStruct) for e in value):
+            raise Exception(
+                f'BinaryReader Error: {value} is not an instance of BrStruct.')
+
+        cls = type(value[0]) if value else None
+
+        if (cls and cls.__br_schema__ is not None and cls.__br_write__ is BrStruct.__br_write__
+                and all(type(e) is cls for e in value)):
+            # Encode all of the elements at once
+            self.__write(BinaryReader.write_struct, value)
+        else:
+            for s in value:
+                s.__br_write__(self, *args)
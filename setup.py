@@ -17,6 +17,9 @@ setup(
   download_url = 'https://github.com/SutandoTsukai181/PyBinaryReader/archive/refs/tags/v1.4.3.tar.gz',
   keywords = ['BINARY', 'IO', 'STRUCT'],
   install_requires=[],
+  extras_require={
+    'numpy': ['numpy'],
+  },
   classifiers=[
     'Development Status :: 5 - Production/Stable',
     'Intended Audience :: Developers',
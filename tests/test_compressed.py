@@ -0,0 +1,80 @@
+import bz2
+import gzip
+import io
+import lzma
+import random
+import unittest
+import zlib
+
+from binary_reader.compressed import CompressedFile
+from binary_reader.stream import BinaryStreamReader
+
+
+def read_in_steps(f: CompressedFile, step: int) -> bytes:
+    chunks = []
+    while True:
+        chunk = f.read(step)
+        if not chunk:
+            return b''.join(chunks)
+
+        chunks.append(chunk)
+        if len(chunks) > 1000:
+            raise AssertionError('read did not stop at the end of the data')
+
+
+class TestConcatenatedStreams(unittest.TestCase):
+    def test_small_reads_across_gzip_members(self):
+        data = gzip.compress(b'A' * 100) + gzip.compress(b'B' * 100)
+
+        for step in (7, 64, 100, 1000):
+            with self.subTest(step=step):
+                self.assertEqual(read_in_steps(CompressedFile(io.BytesIO(data)), step), b'A' * 100 + b'B' * 100)
+
+    def test_small_reads_across_bz2_and_lzma_streams(self):
+        for module in (bz2, lzma):
+            with self.subTest(module=module.__name__):
+                f = CompressedFile(io.BytesIO(module.compress(b'A' * 100) + module.compress(b'B' * 100)))
+                self.assertEqual(read_in_steps(f, 7), b'A' * 100 + b'B' * 100)
+
+                f.seek(150)
+                self.assertEqual(f.read(10), b'B' * 10)
+
+    def test_seeks_across_gzip_members(self):
+        rng = random.Random(1)
+        parts = [rng.getrandbits(300_000 * 8).to_bytes(300_000, 'little') for _ in range(2)]
+        data = b''.join(parts)
+        compressed = gzip.compress(parts[0]) + gzip.compress(parts[1])
+
+        for max_checkpoints in (64, 2):
+            with self.subTest(max_checkpoints=max_checkpoints):
+                with BinaryStreamReader.from_compressed(io.BytesIO(compressed), checkpoint_interval=1 << 15,
+                                                        max_checkpoints=max_checkpoints, window=1 << 12) as br:
+                    for offset in (500_000, 10, 299_990, 599_980, 320_000, 5, 299_999, 400_000):
+                        br.seek(offset)
+                        self.assertEqual(br.read_bytes(20), data[offset:offset + 20])
+
+
+class TestCompressedFile(unittest.TestCase):
+    def test_checkpoints_are_thinned(self):
+        data = random.Random(2).getrandbits(8 << 20).to_bytes(1 << 20, 'little')
+        f = CompressedFile(io.BytesIO(zlib.compress(data)), checkpoint_interval=1 << 14, max_checkpoints=4)
+        self.assertEqual(f.read(), data)
+
+        for offset in (900_000, 100, 700_000, 300_000):
+            f.seek(offset)
+            self.assertEqual(f.read(50), data[offset:offset + 50])
+
+    def test_read_past_end_keeps_position(self):
+        f = CompressedFile(io.BytesIO(gzip.compress(b'abcdef')))
+        f.seek(100)
+
+        self.assertEqual(f.read(4), b'')
+        self.assertEqual(f.tell(), 100)
+
+        f.seek(2)
+        self.assertEqual(f.read(4), b'cdef')
+        self.assertEqual(f.tell(), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()